@@ -5,7 +5,9 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import base64
-from utils.session_manager import navigate_to
+from ml_models.training import predict_batch
+from utils.ingestion import read_csv_chunked
+from utils.session_manager import navigate_to, describe_live_model
 
 
 def render_analysis_page():
@@ -18,8 +20,15 @@ def render_analysis_page():
             navigate_to('Preprocessing')
         return
     
+    # The preview model stays live until the full model replaces it
+    if st.session_state.model_preview is not None:
+        st.warning(
+            f"👁️ Model aktif: {describe_live_model()}. Hasil masih kasar; "
+            f"model penuh menggantikannya setelah training di background selesai."
+        )
+    
     pipeline = st.session_state.pipeline
-    df_proc = st.session_state.df_processed
+    model_inputs = st.session_state.model_inputs
     original_feature_cols = st.session_state.get('original_feature_cols', st.session_state.feature_cols)
     numeric_features = st.session_state.numeric_features
     categorical_features = st.session_state.categorical_features
@@ -29,24 +38,30 @@ def render_analysis_page():
     
     sample_input = {}
     
-    # Create input fields
+    # Create input fields (ranges and categories of the trained model's inputs)
     cols = st.columns(2)
     col_idx = 0
     for c in original_feature_cols:
+        col_inputs = model_inputs.loc[c]
         with cols[col_idx % 2]:
             if c in numeric_features:
+                low, median, high = (
+                    float(col_inputs[stat]) for stat in ('min', 'median', 'max')
+                )
                 val = st.number_input(
                     f"{c}",
-                    value=float(df_proc[c].median()),
-                    min_value=float(df_proc[c].min()) if df_proc[c].min() != np.inf else None,
-                    max_value=float(df_proc[c].max()) if df_proc[c].max() != np.inf else None,
+                    value=median if np.isfinite(median) else 0.0,
+                    min_value=low if np.isfinite(low) else None,
+                    max_value=high if np.isfinite(high) else None,
                     step=0.1
                 )
                 sample_input[c] = val
-            else:
-                vals = df_proc[c].unique().tolist()
-                sel = st.selectbox(f"{c}", options=vals, index=0)
+            elif col_inputs['categories']:
+                sel = st.selectbox(f"{c}", options=col_inputs['categories'], index=0)
                 sample_input[c] = sel
+            else:
+                # No known category: the encoder treats the value as unseen
+                sample_input[c] = st.text_input(f"{c}")
         col_idx += 1
     
     if st.button('Prediksi Pembakaran Kalori', use_container_width=True, type="primary"):
@@ -66,9 +81,33 @@ def render_analysis_page():
             import traceback
             st.code(traceback.format_exc())
     
+    # Batch scoring: the pipeline imputes, encodes and predicts in one call
+    st.markdown("---")
+    st.markdown("### Prediksi Batch")
+    batch_file = st.file_uploader(
+        "Upload CSV data baru (kolom fitur sama dengan data latih)",
+        type=["csv"],
+        key="batch_upload"
+    )
+    if batch_file is not None:
+        try:
+            batch_df, _ = read_csv_chunked(batch_file)
+            scored = predict_batch(pipeline, batch_df, original_feature_cols)
+            st.success(f"✅ {len(scored):,} baris diprediksi")
+            st.dataframe(scored.head(10), use_container_width=True)
+            csv = scored.to_csv(index=False)
+            b64 = base64.b64encode(csv.encode()).decode()
+            href = f'<a href="data:file/csv;base64,{b64}" download="batch_predictions.csv" style="background-color: #8b5cf6; color: white; padding: 0.5rem 1.5rem; border-radius: 8px; text-decoration: none; display: inline-block;">📥 Download batch_predictions.csv</a>'
+            st.markdown(href, unsafe_allow_html=True)
+        except Exception as e:
+            st.error(f"Gagal melakukan prediksi batch: {e}")
+    
     # Download predictions
     st.markdown("---")
-    st.markdown("### Download Hasil Prediksi (Test Set)")
+    if st.session_state.model_evaluation == 'out-of-bag':
+        st.markdown("### Download Hasil Prediksi (Out-of-Bag, Semua Baris)")
+    else:
+        st.markdown("### Download Hasil Prediksi (Test Set)")
     if hasattr(st.session_state, 'X_test'):
         out_df = st.session_state.X_test.copy()
         out_df['actual'] = st.session_state.y_test
@@ -2,8 +2,89 @@
 Dataset page for ForestCal application
 """
 import streamlit as st
-from utils.data_handler import load_dataset, validate_dataset
-from utils.session_manager import navigate_to
+from config.settings import SAMPLE_DEFAULT_ROWS, MULTI_INGEST_ROOT, MULTI_INGEST_PATTERN
+from utils.data_handler import (
+    load_dataset,
+    load_stored_dataset,
+    load_csv_directory,
+    list_stratify_columns
+)
+from utils.columnar_store import is_columnar_available, list_stored_datasets
+from utils.dataset_cache import get_dataset_cache
+from utils.session_manager import (
+    navigate_to,
+    set_active_dataset,
+    get_active_dataframe,
+    get_active_dataset_info
+)
+
+
+def render_sample_info(sample_info):
+    """Render sample size and sampling error of the exploration sample"""
+    error = sample_info['error']
+    max_error = error['relative_error_pct'].max() if len(error) else float('nan')
+    
+    col_s1, col_s2 = st.columns(2)
+    with col_s1:
+        st.metric(
+            "Ukuran Sampel",
+            f"{sample_info['n_sample']:,}",
+            delta=f"{sample_info['n_sample'] / max(sample_info['n_population'], 1) * 100:.1f}% dari data",
+            delta_color="off"
+        )
+    with col_s2:
+        st.metric(
+            "Error Sampling Maks. (rata-rata)",
+            f"±{max_error:.2f}%" if max_error == max_error else "NA"
+        )
+    
+    strata = f", stratifikasi: {sample_info['stratify_col']}" if sample_info['stratify_col'] else ""
+    with st.expander(f"Detail error sampling (standard error rata-rata{strata})"):
+        st.dataframe(
+            error.rename(columns={
+                'mean': 'Rata-rata sampel',
+                'std_error': 'Standard error',
+                'relative_error_pct': 'Error relatif (%)'
+            }),
+            use_container_width=True
+        )
+
+
+def render_stratify_select(columns):
+    """
+    Render the stratification choice for sampling mode
+    
+    Args:
+        columns: categorical columns of the file being sampled
+        
+    Returns:
+        str or None: chosen column, None without stratification
+    """
+    strata_choice = st.selectbox(
+        "Stratifikasi berdasarkan kolom",
+        options=["Tanpa stratifikasi"] + list(columns),
+        key="stratify_col_select",
+        help="Pilihan diambil dari kolom kategorikal file yang akan di-sampling."
+    )
+    return None if strata_choice == "Tanpa stratifikasi" else strata_choice
+
+
+def render_file_report(file_report):
+    """Render per-file timing and status of a multi-file ingest"""
+    st.markdown("**Waktu baca per file**")
+    
+    def highlight(row):
+        color = '' if row['status'] == 'ok' else 'background-color: rgba(239, 68, 68, 0.25)'
+        return [color] * len(row)
+    
+    st.dataframe(
+        file_report.style.apply(highlight, axis=1).format({
+            'size_mb': '{:.2f}',
+            'seconds': '{:.2f}',
+            'mb_per_s': '{:.1f}'
+        }),
+        use_container_width=True
+    )
 
 
 def render_dataset_page():
@@ -14,30 +95,110 @@ def render_dataset_page():
     
     with col1:
         st.markdown("### Upload Dataset")
-        st.markdown("File should be CSV")
-        
-        # Upload area
-        uploaded_file = st.file_uploader(
-            "Drag & Drop your files here",
-            type=["csv"],
-            help="Upload file CSV dengan maksimal 200MB",
-            key="dataset_upload"
+        st.markdown("File should be CSV, Parquet or Arrow")
+        
+        # Sampling mode: explore a streamed sample, train on the full data
+        sample_rows = None
+        stratify_col = None
+        sampling = st.checkbox(
+            "Mode sampling (dataset lebih besar dari memori)",
+            value=False,
+            key="sampling_mode",
+            help="Preview, korelasi dan saran fitur memakai sampel; training tetap memakai seluruh data."
+        )
+        if sampling:
+            sample_rows = int(st.number_input(
+                "Ukuran sampel (baris)",
+                min_value=1000,
+                value=SAMPLE_DEFAULT_ROWS,
+                step=10000,
+                key="sample_rows_input"
+            ))
+        
+        stored_datasets = list_stored_datasets()
+        source_options = ["Upload file"]
+        if MULTI_INGEST_ROOT is not None:
+            source_options.append("Folder CSV harian")
+        if stored_datasets:
+            source_options.append("Dataset tersimpan")
+        source = st.radio(
+            "Sumber dataset",
+            options=source_options,
+            horizontal=True,
+            key="dataset_source_choice"
         )
         
-        # Load dataset
-        df, message, msg_type = load_dataset(uploaded_file)
+        if source == "Folder CSV harian":
+            # Parse every daily CSV of a folder below the ingest root in parallel
+            directory = st.text_input(
+                "Path folder",
+                key="dataset_directory",
+                help=f"Subfolder dari {MULTI_INGEST_ROOT} berisi file CSV harian (.csv, .csv.gz, .csv.zst)"
+            )
+            pattern = st.text_input("Pola nama file", value=MULTI_INGEST_PATTERN, key="dataset_pattern")
+            if sampling:
+                st.caption("Mode sampling tidak berlaku untuk folder; semua file dimuat penuh.")
+            df, message, msg_type, dataset_info = None, None, None, None
+            if directory:
+                with st.spinner('Membaca file secara paralel...'):
+                    df, message, msg_type, dataset_info = load_csv_directory(directory, pattern)
+        elif source == "Dataset tersimpan":
+            # Reopen a dataset kept earlier as an Arrow file
+            stored_names = [f"{d['name']} ({d['size_mb']:.1f} MB)" for d in stored_datasets]
+            stored_idx = st.selectbox(
+                "Pilih dataset tersimpan",
+                options=range(len(stored_datasets)),
+                format_func=lambda i: stored_names[i],
+                key="stored_dataset_select"
+            )
+            if sampling:
+                stratify_col = render_stratify_select(
+                    list_stratify_columns(stored=stored_datasets[stored_idx])
+                )
+            df, message, msg_type, dataset_info = load_stored_dataset(
+                stored_datasets[stored_idx], sample_rows, stratify_col
+            )
+        else:
+            # Upload area
+            uploaded_file = st.file_uploader(
+                "Drag & Drop your files here",
+                type=["csv", "parquet", "arrow", "feather"],
+                help="Upload file CSV, Parquet atau Arrow dengan maksimal 200MB",
+                key="dataset_upload"
+            )
+            
+            keep_columnar = False
+            if is_columnar_available() and not sampling:
+                keep_columnar = st.checkbox(
+                    "Konversi & simpan sebagai Arrow (dibuka ulang memory-mapped di sesi berikutnya)",
+                    value=False,
+                    key="keep_columnar_option"
+                )
+            
+            if sampling:
+                stratify_col = render_stratify_select(list_stratify_columns(uploaded_file))
+            
+            # Load dataset
+            df, message, msg_type, dataset_info = load_dataset(
+                uploaded_file, keep_columnar, sample_rows, stratify_col
+            )
         
         if message:
             if msg_type == "success":
                 st.success(message)
             elif msg_type == "error":
                 st.error(message)
+            elif msg_type == "warning":
+                st.warning(message)
             elif msg_type == "info":
                 st.info(message)
         
-        # Store in session state
+        if dataset_info is not None and dataset_info.get('file_report') is not None:
+            render_file_report(dataset_info['file_report'])
+        
+        # Keep a handle to the shared dataset in session state
         if df is not None:
-            st.session_state.df = df
+            set_active_dataset(dataset_info)
     
     with col2:
         st.markdown("### Ketentuan Dataset")
@@ -45,7 +206,7 @@ def render_dataset_page():
         # Info boxes
         st.markdown("""
         <div class="info-box">
-            <p>📄 CSV Only</p>
+            <p>📄 CSV, Parquet, Arrow</p>
         </div>
         """, unsafe_allow_html=True)
         
@@ -62,8 +223,11 @@ def render_dataset_page():
         """, unsafe_allow_html=True)
     
     # Data exploration
-    if st.session_state.df is not None:
-        df = st.session_state.df
+    if get_active_dataframe() is not None:
+        df = get_active_dataframe()
+        dataset_info = get_active_dataset_info()
+        stats = dataset_info['stats']
+        sample_info = dataset_info.get('sample')
         
         st.markdown("### Eksplorasi Data Awal")
         st.dataframe(df.head(10), use_container_width=True)
@@ -71,11 +235,43 @@ def render_dataset_page():
         # Data info
         col_info1, col_info2, col_info3 = st.columns(3)
         with col_info1:
-            st.metric("Jumlah Baris", len(df))
+            if sample_info:
+                st.metric("Jumlah Baris", sample_info['n_population'])
+            else:
+                st.metric("Jumlah Baris", stats['n_rows'])
         with col_info2:
-            st.metric("Jumlah Kolom", len(df.columns))
+            st.metric("Jumlah Kolom", stats['n_cols'])
         with col_info3:
-            st.metric("Missing Values", df.isnull().sum().sum())
+            st.metric("Missing Values (sampel)" if sample_info else "Missing Values", stats['n_missing'])
+        
+        if sample_info:
+            render_sample_info(sample_info)
+        
+        # Memory footprint of the chunked, downcast ingestion
+        report = dataset_info.get('ingest_report')
+        if report and report['naive_bytes']:
+            naive_mb = report['naive_bytes'] / (1024 * 1024)
+            final_mb = report['final_bytes'] / (1024 * 1024)
+            peak_mb = report['peak_bytes'] / (1024 * 1024)
+            col_mem1, col_mem2, col_mem3 = st.columns(3)
+            with col_mem1:
+                st.metric("Ukuran di Memori", f"{final_mb:.1f} MB",
+                         delta=f"-{(1 - final_mb / naive_mb) * 100:.0f}% vs default dtype",
+                         delta_color="inverse")
+            with col_mem2:
+                st.metric("Puncak Memori Ingest", f"{peak_mb:.1f} MB",
+                         delta=f"-{(1 - peak_mb / naive_mb) * 100:.0f}% vs default dtype",
+                         delta_color="inverse")
+            with col_mem3:
+                st.metric("Chunk Dibaca", report['n_chunks'])
+        
+        # Datasets are held once per server process and shared by sessions
+        usage = get_dataset_cache().usage()
+        st.caption(
+            f"🗄️ Store bersama: {usage['n_entries']} dataset, "
+            f"{usage['bytes'] / (1024 * 1024):.1f} / {usage['max_bytes'] / (1024 * 1024):.0f} MB, "
+            f"{usage['references']} sesi aktif"
+        )
         
         # Next Step
         st.markdown("### Next Step")
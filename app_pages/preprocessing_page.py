@@ -2,31 +2,39 @@
 Preprocessing page for ForestCal application
 """
 import streamlit as st
-from config.settings import MISSING_STRATEGIES, EXCLUDE_COLUMNS
+from config.settings import MISSING_STRATEGIES, EXCLUDE_COLUMNS, ENCODING_MODES
+from ml_models.preprocessing import choose_encoding, estimate_encoded_size
 from utils.data_handler import (
     suggest_target_column,
     suggest_feature_columns,
     get_categorical_columns
 )
-from utils.session_manager import navigate_to
+from utils.session_manager import navigate_to, get_active_dataframe, get_active_dataset_info
 
 
 def render_preprocessing_page():
     """Render the Preprocessing page"""
     st.title("Eksplorasi Data")
     
-    if st.session_state.df is None:
+    if get_active_dataframe() is None:
         st.warning("⚠️ Tidak ada dataset. Silakan upload dataset di halaman Dataset terlebih dahulu.")
         if st.button("Kembali ke Dataset"):
             navigate_to('Dataset')
         return
     
-    df = st.session_state.df.copy()
+    df = get_active_dataframe()
+    dataset_info = get_active_dataset_info()
     
     # Data Table Preview
     st.markdown('<div class="preprocessing-card">', unsafe_allow_html=True)
     st.markdown("### Data Table")
     st.dataframe(df.head(10), use_container_width=True)
+    sample_info = dataset_info.get('sample')
+    if sample_info:
+        st.caption(
+            f"🎲 Eksplorasi memakai sampel {sample_info['n_sample']:,} dari "
+            f"{sample_info['n_population']:,} baris; training memakai seluruh data."
+        )
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Get column info
@@ -111,12 +119,32 @@ def render_preprocessing_page():
     # Data Kategorikal Card
     st.markdown('<div class="preprocessing-card">', unsafe_allow_html=True)
     st.markdown("### Data Kategorikal")
-    cat_cols = get_categorical_columns(df)
+    cat_cols = get_categorical_columns(df, dataset_info['profile'])
     if cat_cols:
         cat_cols_str = ", ".join(cat_cols)
         st.markdown(f"**{cat_cols_str}**")
     else:
         st.markdown("Tidak ada data kategorikal terdeteksi")
+    
+    # Encoding mode, with the encoded matrix size of each mode for the
+    # selected features
+    profile = dataset_info['profile']
+    numeric_features = [c for c in selected_features if profile.loc[c, 'is_numeric']]
+    categorical_features = [c for c in selected_features if not profile.loc[c, 'is_numeric']]
+    auto_encoding = choose_encoding(profile, categorical_features)
+    st.selectbox(
+        "Encoding kategorikal:",
+        options=ENCODING_MODES,
+        format_func=lambda mode: f"auto ({auto_encoding})" if mode == 'auto' else mode,
+        key="encoding_mode"
+    )
+    if categorical_features:
+        n_rows = sample_info['n_population'] if sample_info else len(df)
+        sizes = estimate_encoded_size(n_rows, numeric_features, categorical_features, profile)
+        st.dataframe(
+            sizes.rename(columns={'n_columns': 'Jumlah kolom', 'size_mb': 'Perkiraan ukuran (MB)'}),
+            use_container_width=True
+        )
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Standard Scaler Option
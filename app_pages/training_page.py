@@ -1,30 +1,57 @@
 """
 Training page for ForestCal application
 """
+import time
+import traceback
+
 import streamlit as st
 from config.settings import (
     DEFAULT_TRAIN_SIZE,
     DEFAULT_N_ESTIMATORS,
     DEFAULT_MAX_DEPTH,
     DEFAULT_MIN_SAMPLES_SPLIT,
-    DEFAULT_MIN_SAMPLES_LEAF
+    DEFAULT_MIN_SAMPLES_LEAF,
+    FEATURE_DTYPE,
+    TRAINING_POLL_SECONDS,
+    SEARCH_N_CANDIDATES,
+    SEARCH_DEFAULT_BUDGET_SECONDS,
+    EVALUATION_MODES,
+    CV_DEFAULT_FOLDS,
+    MODEL_ENGINES,
+    HGB_LEARNING_RATE,
+    BUDGET_DEFAULT_SECONDS
+)
+from ml_models.preprocessing import choose_encoding
+from ml_models.preprocessing_cache import (
+    preprocess_data_cached,
+    get_preprocess_cache,
+    make_preprocess_key
+)
+from ml_models.training import (
+    evaluate_model,
+    get_feature_importance,
+    summarize_cross_validation,
+    model_size_bytes,
+    train_preview,
+    describe_model_inputs
 )
-from ml_models.preprocessing import preprocess_data
-from ml_models.training import train_model, evaluate_model, get_feature_importance
-from utils.session_manager import navigate_to
+from ml_models.training_jobs import get_training_executor
+from utils.data_handler import load_columns
+from utils.session_manager import navigate_to, get_active_dataframe, get_active_dataset_info
 
 
 def render_training_page():
     """Render the Training page"""
     st.title("Pengaturan Training")
     
-    if st.session_state.df is None:
+    if get_active_dataframe() is None:
         st.warning("⚠️ Tidak ada dataset. Silakan upload dataset di halaman Dataset terlebih dahulu.")
         if st.button("Kembali ke Dataset"):
             navigate_to('Dataset')
         return
     
-    df = st.session_state.df.copy()
+    df = get_active_dataframe()
+    dataset_info = get_active_dataset_info()
     
     # Get settings from session state
     if st.session_state.target_col is None:
@@ -37,6 +64,15 @@ def render_training_page():
     feature_cols = st.session_state.feature_cols
     missing_strategy = st.session_state.get('missing_strategy', 'drop rows')
     scaling = st.session_state.get('scaling_option', False)
+    encoding = st.session_state.get('encoding_mode', 'auto')
+    
+    sample_info = dataset_info.get('sample')
+    if sample_info:
+        st.info(
+            f"🎲 Mode sampling aktif: training membaca seluruh "
+            f"{sample_info['n_population']:,} baris dari sumber data (hanya kolom terpilih); "
+            f"nilai imputasi dihitung dari baris latih."
+        )
     
     # Section 1: Rasio Data Latih
     st.markdown('<div class="training-section">', unsafe_allow_html=True)
@@ -67,9 +103,49 @@ def render_training_page():
     st.session_state.random_state = random_state
     st.markdown('</div>', unsafe_allow_html=True)
     
-    # Section 3: Hyperparameter Random Forest
+    # Section 3: Metode Evaluasi
+    st.markdown('<div class="training-section">', unsafe_allow_html=True)
+    st.markdown("### Metode Evaluasi")
+    evaluation_mode = st.selectbox(
+        "Metode evaluasi",
+        options=EVALUATION_MODES,
+        key="evaluation_mode",
+        help="Hold-out menilai model pada satu test set. K-fold CV juga melatih konfigurasi "
+             "yang sama pada K fold dan melaporkan rata-rata serta sebaran metrik, sehingga "
+             "hasilnya tidak bergantung pada satu random state. Out-of-bag melatih model pada "
+             "seluruh baris dan menilai setiap baris dengan pohon yang tidak melihatnya."
+    )
+    if evaluation_mode == 'out-of-bag':
+        st.caption("ℹ️ Rasio data latih diabaikan: semua baris dipakai untuk training dan evaluasi out-of-bag.")
+    n_folds = CV_DEFAULT_FOLDS
+    if evaluation_mode == 'k-fold CV':
+        n_folds = st.slider(
+            "Jumlah fold (K)",
+            min_value=3,
+            max_value=10,
+            value=CV_DEFAULT_FOLDS,
+            step=1,
+            key="cv_folds_slider",
+            help="Fold dilatih paralel; core dibagi antara fold dan pohon di setiap fold."
+        )
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Section 4: Engine and hyperparameters
     st.markdown('<div class="training-section">', unsafe_allow_html=True)
-    st.markdown("### Hyperparameter Random Forest")
+    st.markdown("### Engine dan Hyperparameter Model")
+    engine = st.selectbox(
+        "Engine model",
+        options=MODEL_ENGINES,
+        key="engine_select",
+        help="Random forest: rata-rata banyak pohon dalam. Hist gradient boosting: pohon kecil "
+             "berurutan di atas fitur yang di-bin, split kategori native dan early stopping; "
+             "jauh lebih cepat dan kecil untuk data besar."
+    )
+    if engine == 'hist gradient boosting':
+        st.caption(
+            "ℹ️ n_estimators = jumlah iterasi maksimum (berhenti lebih awal jika validasi tidak "
+            "membaik), min_samples_split tidak dipakai, fitur kategorikal selalu di-encode ordinal."
+        )
     
     n_estimators = st.slider(
         "n_estimators (lebih banyak = lebih stabil)",
@@ -112,11 +188,87 @@ def render_training_page():
         key="min_samples_leaf_slider",
         help="Minimal sampel di setiap leaf. Nilai lebih besar = prediksi lebih halus."
     )
+    oob_early_stopping = False
+    if engine == 'random forest':
+        oob_early_stopping = st.checkbox(
+            "Berhenti otomatis saat error OOB konvergen",
+            key="oob_early_stopping",
+            help="Pohon ditambah bertahap; setelah setiap tahap error out-of-bag diukur dan "
+                 "training berhenti saat penurunannya di bawah toleransi. n_estimators menjadi "
+                 "batas maksimum."
+        )
+    learning_rate = HGB_LEARNING_RATE
+    if engine == 'hist gradient boosting':
+        learning_rate = st.slider(
+            "learning_rate (kontribusi setiap iterasi)",
+            min_value=0.01,
+            max_value=1.0,
+            value=HGB_LEARNING_RATE,
+            step=0.01,
+            key="learning_rate_slider",
+            help="Nilai kecil butuh lebih banyak iterasi tetapi biasanya lebih akurat."
+        )
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Section 5: Batas Waktu Training
+    st.markdown('<div class="training-section">', unsafe_allow_html=True)
+    st.markdown("### Batas Waktu Training")
+    use_budget = st.checkbox(
+        "Latih dalam batas waktu",
+        key="time_budget_enabled",
+        help="Training pilot kecil mengukur biaya per pohon dan per baris, lalu jumlah pohon "
+             "(paling banyak n_estimators) dan ukuran sampel bootstrap (max_samples) dipilih "
+             "agar training selesai dalam batas waktu. Hanya random forest dengan hold-out."
+    )
+    time_budget = BUDGET_DEFAULT_SECONDS
+    if use_budget:
+        time_budget = st.slider(
+            "Batas waktu training (detik)",
+            min_value=5,
+            max_value=600,
+            value=BUDGET_DEFAULT_SECONDS,
+            step=5,
+            key="time_budget_slider"
+        )
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Preprocessing results are cached per dataset, features and strategy
+    if st.button("Kosongkan cache preprocessing dataset ini", key="clear_preprocess_cache"):
+        n_removed = get_preprocess_cache().evict(dataset_info['key'])
+        st.caption(f"🧹 {n_removed} hasil preprocessing dihapus dari cache")
+    
+    # Section 6: Pencarian Hyperparameter Otomatis
+    st.markdown('<div class="training-section">', unsafe_allow_html=True)
+    st.markdown("### Pencarian Hyperparameter Otomatis")
+    st.caption(
+        f"Random Forest: successive halving atas {SEARCH_N_CANDIDATES} kombinasi max_depth, min_samples_split "
+        f"dan min_samples_leaf dari rentang slider di atas: kandidat dievaluasi paralel di semua "
+        f"core dengan sebagian data dan pohon, yang terbaik mendapat lebih banyak. Kandidat "
+        f"terbaik dilatih ulang dengan n_estimators di atas."
+    )
+    search_budget = st.slider(
+        "Batas waktu pencarian (detik)",
+        min_value=10,
+        max_value=600,
+        value=SEARCH_DEFAULT_BUDGET_SECONDS,
+        step=10,
+        key="search_budget_slider",
+        help="Mencakup pencarian dan training model akhir."
+    )
+    search_clicked = st.button("Cari Hyperparameter Terbaik", use_container_width=True, key="search_hyperparameters")
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Training button
     st.markdown("<br>", unsafe_allow_html=True)
-    if st.button("Jalankan Preprocessing dan Latih Model", use_container_width=True, type="primary"):
+    progressive = st.checkbox(
+        "Tampilkan model pratinjau selama training",
+        key="progressive_preview",
+        help="Forest kecil dan dangkal dilatih pada sampel data latih dalam satu-dua detik dan "
+             "langsung dipakai di halaman visualisasi dan analisis, sampai model penuh selesai "
+             "dilatih di background dan menggantikannya."
+    )
+    train_clicked = st.button("Jalankan Preprocessing dan Latih Model", use_container_width=True, type="primary")
+    if train_clicked or search_clicked:
         # Validate
         if not feature_cols or len(feature_cols) == 0:
             st.error("❌ Fitur belum dipilih. Silakan kembali ke halaman Preprocessing untuk memilih fitur.")
@@ -131,88 +283,530 @@ def render_training_page():
             st.error(f"❌ Fitur berikut tidak ditemukan dalam dataset: {', '.join(missing_features)}")
             return
         
+        # The search tunes forest hyperparameters only
+        if search_clicked:
+            engine = 'random forest'
+        if engine == 'hist gradient boosting' and evaluation_mode == 'out-of-bag':
+            st.error("❌ Evaluasi out-of-bag hanya tersedia untuk random forest (boosting tidak memakai bootstrap).")
+            return
+        if train_clicked and use_budget and (engine != 'random forest' or evaluation_mode != 'hold-out'):
+            st.error("❌ Batas waktu training hanya tersedia untuk random forest dengan evaluasi hold-out.")
+            return
+        if train_clicked and oob_early_stopping and (use_budget or evaluation_mode != 'hold-out'):
+            st.error("❌ Berhenti otomatis (OOB) hanya tersedia dengan evaluasi hold-out dan tanpa batas waktu.")
+            return
+        
         try:
-            # Preprocessing
-            with st.spinner('Memproses data...'):
-                preprocess_result = preprocess_data(
-                    df, feature_cols, target_col, missing_strategy, scaling
-                )
-            
-            X = preprocess_result['X']
-            y = preprocess_result['y']
-            df_proc = preprocess_result['df_processed']
-            preprocessor = preprocess_result['preprocessor']
-            numeric_features = preprocess_result['numeric_features']
-            categorical_features = preprocess_result['categorical_features']
-            
-            # Training
-            with st.spinner('Melatih model...'):
-                train_result = train_model(
-                    X, y, preprocessor, train_size, random_state,
-                    n_estimators, max_depth, min_samples_split, min_samples_leaf
+            if engine == 'hist gradient boosting':
+                # Boosting splits the ordinal codes as native categories
+                encoding = 'ordinal'
+            elif encoding == 'auto':
+                profile = dataset_info['profile']
+                encoding = choose_encoding(
+                    profile, [c for c in feature_cols if not profile.loc[c, 'is_numeric']]
                 )
             
-            pipeline = train_result['pipeline']
-            X_train = train_result['X_train']
-            X_test = train_result['X_test']
-            y_train = train_result['y_train']
-            y_test = train_result['y_test']
-            y_pred = train_result['y_pred']
-            y_pred_baseline = train_result['y_pred_baseline']
-            
-            # Evaluation
-            metrics = evaluate_model(y_test, y_pred, y_pred_baseline)
-            
-            # Store in session state
-            st.session_state.df_processed = df_proc
-            st.session_state.pipeline = pipeline
-            st.session_state.X_test = X_test
-            st.session_state.y_test = y_test
-            st.session_state.y_pred = y_pred
-            st.session_state.X_train = X_train
-            st.session_state.y_train = y_train
-            st.session_state.y_pred_baseline = y_pred_baseline
-            st.session_state.numeric_features = numeric_features
-            st.session_state.categorical_features = categorical_features
-            st.session_state.original_feature_cols = feature_cols
-            
-            st.success('✅ Pelatihan selesai! Model siap digunakan.')
+            # Everything but n_estimators: when it matches the trained
+            # model, its trees and train/test split are kept and only the
+            # tree count changes
+            training_key = (
+                make_preprocess_key(
+                    dataset_info['key'], feature_cols, target_col, missing_strategy, scaling,
+                    encoding, FEATURE_DTYPE
+                ),
+                train_size, random_state, max_depth, min_samples_split, min_samples_leaf
+            )
+            # Runs on the same data and split are compared across engines
+            comparison_key = training_key[0][:5] + (
+                train_size, random_state,
+                'out-of-bag' if evaluation_mode == 'out-of-bag' and not search_clicked else 'hold-out'
+            )
             
-            # Display metrics
-            st.markdown("### Hasil Evaluasi Model (Test Set)")
+            # Training runs as a background job, so reruns and page
+            # changes do not discard it; the page follows it below
+            executor = get_training_executor()
+            previous_job = st.session_state.get('training_job')
+            if previous_job is not None:
+                executor.forget(previous_job['id'])
             
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("MAE (model)", f"{metrics['mae']:.3f}", 
-                         delta=f"{metrics['mae_delta']:.3f} vs baseline")
-            with col2:
-                st.metric("RMSE (model)", f"{metrics['rmse']:.3f}", 
-                         delta=f"{metrics['rmse_delta']:.3f} vs baseline")
-            with col3:
-                st.metric("R² (model)", f"{metrics['r2']:.3f}", 
-                         delta=f"{metrics['r2_delta']:.3f} vs baseline")
-            with col4:
-                if not pd.isna(metrics['mape']):
-                    st.metric("MAPE", f"{metrics['mape']:.2f}%")
+            # Cross-validation refits every fold and out-of-bag models
+            # have no test split, so only hold-out forests on full
+            # bootstrap samples grow; budgeted runs pick their own size
+            if (train_clicked and evaluation_mode == 'hold-out' and engine == 'random forest'
+                    and not use_budget and not oob_early_stopping
+                    and st.session_state.model_evaluation == 'hold-out'
+                    and st.session_state.model_engine == 'random forest'
+                    and st.session_state.pipeline is not None
+                    and st.session_state.pipeline.named_steps['model'].max_samples is None
+                    and st.session_state.training_key == training_key):
+                pipeline = st.session_state.pipeline
+                job_id = executor.submit_growth({
+                    'pipeline': pipeline,
+                    'X_train': st.session_state.X_train,
+                    'X_test': st.session_state.X_test,
+                    'y_train': st.session_state.y_train,
+                    'y_test': st.session_state.y_test
+                }, n_estimators)
+                st.session_state.training_job = {
+                    'id': job_id,
+                    'training_key': training_key,
+                    'comparison_key': comparison_key,
+                    'engine': engine,
+                    'grown_from': len(pipeline.named_steps['model'].estimators_),
+                    'progress_unit': 'pohon',
+                    'feature_cols': st.session_state.original_feature_cols,
+                    'numeric_features': st.session_state.numeric_features,
+                    'categorical_features': st.session_state.categorical_features,
+                    'profile': st.session_state.column_profile,
+                    'encoding': encoding,
+                    'preprocess_hit': None
+                }
+            else:
+                # Preprocessing (only target + selected features are loaded),
+                # reused when dataset, features, strategy and encoding are unchanged
+                with st.spinner('Memproses data...'):
+                    preprocess_result, preprocess_hit = preprocess_data_cached(
+                        dataset_info['key'],
+                        lambda: load_columns(df, feature_cols + [target_col], dataset_info),
+                        feature_cols, target_col, missing_strategy, scaling,
+                        encoding, FEATURE_DTYPE
+                    )
+                
+                X = preprocess_result['X']
+                y = preprocess_result['y']
+                preprocessor = preprocess_result['preprocessor']
+                numeric_features = preprocess_result['numeric_features']
+                categorical_features = preprocess_result['categorical_features']
+                
+                if search_clicked:
+                    job_id = executor.submit_search(
+                        X, y, preprocessor,
+                        train_size=train_size,
+                        random_state=random_state,
+                        n_estimators=n_estimators,
+                        time_budget=search_budget
+                    )
+                    # Completed with the best parameters once the search ends
+                    training_key = training_key[:3]
+                    progress_unit = 'evaluasi kandidat'
+                elif evaluation_mode == 'k-fold CV':
+                    job_id = executor.submit_cross_validation(
+                        X, y, preprocessor,
+                        train_size=train_size,
+                        random_state=random_state,
+                        n_estimators=n_estimators,
+                        max_depth=max_depth,
+                        min_samples_split=min_samples_split,
+                        min_samples_leaf=min_samples_leaf,
+                        n_splits=n_folds,
+                        engine=engine,
+                        learning_rate=learning_rate
+                    )
+                    progress_unit = 'model (hold-out + fold)'
+                elif evaluation_mode == 'out-of-bag':
+                    job_id = executor.submit_oob(
+                        X, y, preprocessor,
+                        random_state=random_state,
+                        n_estimators=n_estimators,
+                        max_depth=max_depth,
+                        min_samples_split=min_samples_split,
+                        min_samples_leaf=min_samples_leaf
+                    )
+                    progress_unit = 'pohon'
+                elif use_budget:
+                    job_id = executor.submit_budgeted(
+                        X, y, preprocessor, time_budget,
+                        train_size=train_size,
+                        random_state=random_state,
+                        n_estimators=n_estimators,
+                        max_depth=max_depth,
+                        min_samples_split=min_samples_split,
+                        min_samples_leaf=min_samples_leaf
+                    )
+                    progress_unit = 'pohon'
+                elif oob_early_stopping:
+                    job_id = executor.submit_until_converged(
+                        X, y, preprocessor,
+                        train_size=train_size,
+                        random_state=random_state,
+                        n_estimators=n_estimators,
+                        max_depth=max_depth,
+                        min_samples_split=min_samples_split,
+                        min_samples_leaf=min_samples_leaf
+                    )
+                    progress_unit = 'pohon (maks)'
                 else:
-                    st.metric("MAPE", "NA")
-            
-            st.info(
-                "Model Random Forest yang baik seharusnya **lebih baik dari baseline rata-rata**. "
-                "Perhatikan delta pada MAE/RMSE/R² untuk menilai apakah model sudah cukup baik."
-            )
-            
-            # Generate and store feature importance for visualization page
-            importance_df = get_feature_importance(pipeline)
-            if importance_df is not None:
-                st.session_state.feature_importances = importance_df
+                    job_id = executor.submit(
+                        X, y, preprocessor,
+                        train_size=train_size,
+                        random_state=random_state,
+                        n_estimators=n_estimators,
+                        max_depth=max_depth,
+                        min_samples_split=min_samples_split,
+                        min_samples_leaf=min_samples_leaf,
+                        engine=engine,
+                        learning_rate=learning_rate
+                    )
+                    progress_unit = 'iterasi' if engine == 'hist gradient boosting' else 'pohon'
+                st.session_state.training_job = {
+                    'id': job_id,
+                    'training_key': training_key,
+                    'comparison_key': comparison_key,
+                    'engine': engine,
+                    'grown_from': None,
+                    'progress_unit': progress_unit,
+                    'feature_cols': feature_cols,
+                    'numeric_features': numeric_features,
+                    'categorical_features': categorical_features,
+                    'profile': dataset_info['profile'],
+                    'encoding': encoding,
+                    'preprocess_hit': preprocess_hit
+                }
+                
+                # The preview trains here while the full model trains in
+                # the worker, and is live until the full model replaces it
+                if progressive:
+                    with st.spinner('Melatih model pratinjau...'):
+                        preview_result = train_preview(X, y, preprocessor, train_size, random_state)
+                    _store_model(st.session_state.training_job, preview_result)
+                    st.session_state.model_engine = 'random forest'
+                    st.session_state.model_preview['metrics'] = evaluate_model(
+                        preview_result['y_test'], preview_result['y_pred'],
+                        preview_result['y_pred_baseline']
+                    )
             
         except Exception as e:
-            st.error(f"❌ Terjadi error saat melakukan preprocessing dan training: {str(e)}")
-            st.error("Detail error:")
-            import traceback
-            st.code(traceback.format_exc())
-            st.info("💡 Tips: Pastikan dataset sudah di-upload dan kolom target serta fitur sudah dipilih dengan benar.")
+            _show_training_error(e)
+    
+    # Follow the training job of this session
+    job = st.session_state.get('training_job')
+    if job is not None:
+        _render_training_job(job)
+
+
+def _show_training_error(e):
+    """Show a preprocessing or training error with its traceback"""
+    st.error(f"❌ Terjadi error saat melakukan preprocessing dan training: {str(e)}")
+    st.error("Detail error:")
+    st.code(traceback.format_exc())
+    st.info("💡 Tips: Pastikan dataset sudah di-upload dan kolom target serta fitur sudah dipilih dengan benar.")
+
+
+def _render_training_job(job):
+    """
+    Show progress of a running training job, or attach its result
+    
+    While the job is queued or running the page reruns itself every
+    TRAINING_POLL_SECONDS to refresh the progress bar.
+    
+    Args:
+        job: job record stored in st.session_state.training_job
+    """
+    executor = get_training_executor()
+    status = executor.status(job['id'])
+    
+    if status['state'] in ('queued', 'running'):
+        if st.session_state.model_preview is not None:
+            _show_preview()
+        if status['state'] == 'queued':
+            st.progress(
+                0.0,
+                text=f"⏳ Menunggu giliran training: antrean ke-{status['position']} "
+                     f"({status['n_running']} job sedang berjalan di server)"
+            )
+        else:
+            n_done, n_total = status['n_done'], status['n_total']
+            st.progress(
+                n_done / n_total if n_total else 0.0,
+                text=f"🌲 Melatih model: {n_done}/{n_total} {job['progress_unit']} "
+                     f"({status['cores']} core)"
+            )
+        if st.button("Batalkan Training", key="cancel_training"):
+            executor.cancel(job['id'])
+        else:
+            time.sleep(TRAINING_POLL_SECONDS)
+        st.rerun()
+    
+    st.session_state.training_job = None
+    if status['state'] == 'unknown':
+        st.warning("⚠️ Job training tidak ditemukan (server mungkin dimulai ulang atau hasilnya kedaluwarsa). Silakan latih ulang model.")
+        return
+    if status['state'] == 'cancelled':
+        executor.forget(job['id'])
+        st.warning("⚠️ Training dibatalkan.")
+        if st.session_state.model_preview is not None:
+            _show_preview()
+        return
+    
+    try:
+        train_result = executor.result(job['id'])
+    except Exception as e:
+        _show_training_error(e)
+        if st.session_state.model_preview is not None:
+            _show_preview()
+        return
+    _show_training_result(job, train_result)
+
+
+def _store_model(job, train_result):
+    """
+    Make a trained model the live model of the session
+    
+    Args:
+        job: job record stored in st.session_state.training_job
+        train_result: dict returned by train_model or train_preview
+    """
+    st.session_state.pipeline = train_result['pipeline']
+    st.session_state.X_test = train_result['X_test']
+    st.session_state.y_test = train_result['y_test']
+    st.session_state.y_pred = train_result['y_pred']
+    st.session_state.X_train = train_result['X_train']
+    st.session_state.y_train = train_result['y_train']
+    st.session_state.y_pred_baseline = train_result['y_pred_baseline']
+    st.session_state.numeric_features = job['numeric_features']
+    st.session_state.categorical_features = job['categorical_features']
+    st.session_state.original_feature_cols = job['feature_cols']
+    st.session_state.column_profile = job['profile']
+    st.session_state.model_inputs = describe_model_inputs(
+        train_result['pipeline'], train_result['X_train'],
+        job['numeric_features'], job['categorical_features']
+    )
+    st.session_state.model_evaluation = train_result.get('evaluation', 'hold-out')
+    st.session_state.model_engine = job['engine']
+    st.session_state.model_preview = train_result.get('preview')
+    st.session_state.feature_importances = None
+    # Only a full model can be grown later
+    st.session_state.training_key = None
+
+
+def _show_preview():
+    """Show that the preview model is live, with its rough metrics"""
+    preview = st.session_state.model_preview
+    metrics = preview['metrics']
+    st.warning(
+        f"👁️ Model aktif: PRATINJAU ({preview['n_estimators']} pohon, kedalaman "
+        f"{preview['max_depth']}, {preview['n_rows']:,} baris sampel). Metrik di bawah masih "
+        f"kasar; model penuh menggantikannya setelah training selesai."
+    )
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("MAE (pratinjau)", f"{metrics['mae']:.3f}")
+    with col2:
+        st.metric("RMSE (pratinjau)", f"{metrics['rmse']:.3f}")
+    with col3:
+        st.metric("R² (pratinjau)", f"{metrics['r2']:.3f}")
+
+
+def _show_training_result(job, train_result):
+    """
+    Evaluate a finished training job, store the model in session state
+    and show the metrics
+    
+    Args:
+        job: job record stored in st.session_state.training_job
+        train_result: dict returned by train_model
+    """
+    numeric_features = job['numeric_features']
+    categorical_features = job['categorical_features']
+    pipeline = train_result['pipeline']
+    X_test = train_result['X_test']
+    y_test = train_result['y_test']
+    y_pred = train_result['y_pred']
+    y_pred_baseline = train_result['y_pred_baseline']
+    
+    # Evaluation
+    metrics = evaluate_model(y_test, y_pred, y_pred_baseline)
+    
+    # Store in session state
+    replaced_preview = st.session_state.model_preview is not None
+    _store_model(job, train_result)
+    training_key = job['training_key']
+    if 'best_params' in train_result:
+        best_params = train_result['best_params']
+        training_key += (
+            best_params['max_depth'], best_params['min_samples_split'], best_params['min_samples_leaf']
+        )
+    st.session_state.training_key = training_key
+    
+    st.success(
+        '✅ Pelatihan selesai! Model penuh menggantikan model pratinjau dan siap digunakan.'
+        if replaced_preview else '✅ Pelatihan selesai! Model siap digunakan.'
+    )
+    if job['grown_from'] is not None:
+        n_trees = len(pipeline.named_steps['model'].estimators_)
+        if n_trees > job['grown_from']:
+            st.caption(
+                f"🌲 {job['grown_from']} pohon dipakai ulang, "
+                f"{n_trees - job['grown_from']} pohon baru dilatih (split data sama)"
+            )
+        else:
+            st.caption(f"🌲 Model dipangkas dari {job['grown_from']} ke {n_trees} pohon tanpa training ulang")
+    else:
+        cache_stats = get_preprocess_cache().stats()
+        st.caption(
+            f"{'⚡ Preprocessing dari cache' if job['preprocess_hit'] else '🔄 Preprocessing dihitung ulang'} "
+            f"(hit {cache_stats['hits']}, miss {cache_stats['misses']}, "
+            f"{cache_stats['n_entries']} hasil tersimpan, "
+            f"{cache_stats['bytes'] / (1024 * 1024):.1f} MB)"
+        )
+    if categorical_features:
+        st.caption(f"🔤 Encoding kategorikal: {job['encoding']}")
+    if 'budget' in train_result:
+        budget = train_result['budget']
+        max_samples = budget['max_samples']
+        st.caption(
+            f"⏱️ Batas waktu {budget['time_budget']} detik: {budget['n_estimators']} pohon, "
+            f"max_samples {'semua baris' if max_samples is None else f'{max_samples:.0%} baris'}. "
+            f"Estimasi {budget['estimated_seconds']:.1f} detik, aktual "
+            f"{budget['actual_seconds']:.1f} detik (+ pilot {budget['pilot_seconds']:.1f} detik)"
+        )
+    # Display metrics
+    if st.session_state.model_evaluation == 'out-of-bag':
+        st.markdown("### Hasil Evaluasi Model (Out-of-Bag)")
+        st.caption(
+            f"Model dilatih pada seluruh {len(y_test):,} baris; setiap baris diprediksi oleh "
+            f"pohon yang tidak memakainya dalam sampel bootstrap. Baseline = rata-rata target."
+        )
+    else:
+        st.markdown("### Hasil Evaluasi Model (Test Set)")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("MAE (model)", f"{metrics['mae']:.3f}", 
+                 delta=f"{metrics['mae_delta']:.3f} vs baseline")
+    with col2:
+        st.metric("RMSE (model)", f"{metrics['rmse']:.3f}", 
+                 delta=f"{metrics['rmse_delta']:.3f} vs baseline")
+    with col3:
+        st.metric("R² (model)", f"{metrics['r2']:.3f}", 
+                 delta=f"{metrics['r2_delta']:.3f} vs baseline")
+    with col4:
+        if not pd.isna(metrics['mape']):
+            st.metric("MAPE", f"{metrics['mape']:.2f}%")
+        else:
+            st.metric("MAPE", "NA")
+    
+    st.info(
+        "Model Random Forest yang baik seharusnya **lebih baik dari baseline rata-rata**. "
+        "Perhatikan delta pada MAE/RMSE/R² untuk menilai apakah model sudah cukup baik."
+    )
+    
+    if 'oob_curve' in train_result:
+        oob_curve = train_result['oob_curve']
+        n_trees = int(oob_curve['n_trees'].iloc[-1])
+        st.markdown("### Error Out-of-Bag vs Jumlah Pohon")
+        st.caption(
+            f"🌲 {'Konvergen' if train_result['converged'] else 'Batas maksimum tercapai'} "
+            f"pada {n_trees} pohon (MAE OOB {oob_curve['oob_mae'].iloc[-1]:.3f}); "
+            f"training {train_result['fit_seconds']:.1f} detik."
+        )
+        st.line_chart(
+            oob_curve.rename(columns={'n_trees': 'Jumlah pohon', 'oob_mae': 'MAE OOB'})
+            .set_index('Jumlah pohon')
+        )
+    
+    if 'cv_folds' in train_result:
+        cv_folds = train_result['cv_folds']
+        summary = summarize_cross_validation(cv_folds)
+        st.markdown(f"### Hasil {len(cv_folds)}-Fold Cross-Validation")
+        col1, col2, col3, col4 = st.columns(4)
+        for col, (name, label) in zip(
+            (col1, col2, col3, col4),
+            (('mae', 'MAE'), ('rmse', 'RMSE'), ('r2', 'R²'), ('mape', 'MAPE (%)'))
+        ):
+            with col:
+                mean, std = summary.loc[name, 'mean'], summary.loc[name, 'std']
+                st.metric(f"{label} (rata-rata)", "NA" if pd.isna(mean) else f"{mean:.3f}")
+                if not pd.isna(std):
+                    st.caption(f"± {std:.3f} (simpangan baku antar fold)")
+        st.dataframe(
+            cv_folds[['mae', 'rmse', 'r2', 'mape', 'mae_baseline', 'rmse_baseline']].rename(columns={
+                'mae': 'MAE',
+                'rmse': 'RMSE',
+                'r2': 'R²',
+                'mape': 'MAPE (%)',
+                'mae_baseline': 'MAE baseline',
+                'rmse_baseline': 'RMSE baseline'
+            }),
+            use_container_width=True
+        )
+    
+    if 'leaderboard' in train_result:
+        best_params = train_result['best_params']
+        st.markdown("### Leaderboard Pencarian Hyperparameter")
+        st.markdown(
+            f"**Terbaik:** max_depth={best_params['max_depth']}, "
+            f"min_samples_split={best_params['min_samples_split']}, "
+            f"min_samples_leaf={best_params['min_samples_leaf']}, "
+            f"n_estimators={best_params['n_estimators']}"
+        )
+        st.caption(
+            f"⏱️ Pencarian dan training selesai dalam {train_result['search_seconds']:.1f} detik"
+            + (" (dihentikan lebih awal karena batas waktu)" if train_result['stopped_early'] else "")
+            + ". MAE validasi dihitung dari sebagian data latih; test set tidak dipakai untuk memilih."
+        )
+        st.dataframe(
+            train_result['leaderboard'].rename(columns={
+                'candidate': 'Kandidat',
+                'rung': 'Tahap',
+                'n_rows': 'Baris',
+                'n_trees': 'Pohon',
+                'val_mae': 'MAE validasi',
+                'seconds': 'Detik'
+            }),
+            use_container_width=True
+        )
+    
+    _show_engine_comparison(job, train_result, metrics)
+    
+    # Generate and store feature importance for visualization page
+    importance_df = get_feature_importance(pipeline, X_test, y_test)
+    if importance_df is not None:
+        st.session_state.feature_importances = importance_df
+
+
+def _show_engine_comparison(job, train_result, metrics):
+    """
+    Record the finished run for its engine and compare fit time, model
+    size and accuracy with the other engine on the same data and split
+    
+    Args:
+        job: job record stored in st.session_state.training_job
+        train_result: dict returned by the training job
+        metrics: evaluate_model result of the run
+    """
+    comparison = st.session_state.engine_comparison
+    if comparison is None or comparison['key'] != job['comparison_key']:
+        comparison = {'key': job['comparison_key'], 'runs': {}}
+    
+    if 'fit_seconds' in train_result:
+        model = train_result['pipeline'].named_steps['model']
+        comparison['runs'][job['engine']] = {
+            'Engine': job['engine'],
+            'Waktu fit (detik)': train_result['fit_seconds'],
+            'Ukuran model (MB)': model_size_bytes(train_result['pipeline']) / (1024 * 1024),
+            'Pohon / iterasi': len(model.estimators_) if hasattr(model, 'estimators_') else model.n_iter_,
+            'MAE': metrics['mae'],
+            'RMSE': metrics['rmse'],
+            'R²': metrics['r2'],
+            'MAPE (%)': metrics['mape']
+        }
+    else:
+        # A grown or truncated forest has no comparable fit time
+        comparison['runs'].pop(job['engine'], None)
+    st.session_state.engine_comparison = comparison
+    
+    if comparison['runs']:
+        st.markdown("### Perbandingan Engine")
+        st.caption(
+            "Dataset, fitur dan split data sama. Latih dengan engine lain untuk melengkapi perbandingan."
+            if len(comparison['runs']) < len(MODEL_ENGINES) else
+            "Dataset, fitur dan split data sama untuk kedua engine."
+        )
+        st.dataframe(
+            pd.DataFrame(list(comparison['runs'].values())).set_index('Engine'),
+            use_container_width=True
+        )
 
 
 # Import pandas for isna check
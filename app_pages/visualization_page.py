@@ -4,7 +4,9 @@ Visualization page for ForestCal application
 import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
-from utils.session_manager import navigate_to
+from utils.session_manager import (
+    navigate_to, get_active_dataframe, get_active_dataset_info, describe_live_model
+)
 from ml_models.training import get_feature_importance, plot_feature_importance
 
 
@@ -21,7 +23,17 @@ def render_visualization_page():
     pipeline = st.session_state.pipeline
     y_test = st.session_state.y_test
     y_pred = st.session_state.y_pred
-    df_proc = st.session_state.df_processed
+    
+    # The preview model stays live until the full model replaces it
+    if st.session_state.model_preview is not None:
+        st.warning(
+            f"👁️ Model aktif: {describe_live_model()}. Hasil masih kasar; "
+            f"model penuh menggantikannya setelah training di background selesai."
+        )
+    
+    # Out-of-bag models are evaluated on all rows instead of a test set
+    if st.session_state.model_evaluation == 'out-of-bag':
+        st.caption(f"📊 Prediksi out-of-bag untuk seluruh {len(y_test):,} baris")
     
     # Predicted vs Actual
     st.markdown("### Visualisasi Prediksi vs Aktual")
@@ -55,9 +67,19 @@ def render_visualization_page():
     plt.tight_layout()
     st.pyplot(fig2)
     
-    # Correlation heatmap
+    # Correlation heatmap of the model columns, read from the shared
+    # dataset (the exploration sample in sampling mode)
     st.markdown("### Heatmap Korelasi (Fitur Numerik)")
-    numeric_df = df_proc.select_dtypes(include=['number'])
+    dataset_info = get_active_dataset_info()
+    active_df = get_active_dataframe()
+    model_cols = st.session_state.original_feature_cols + [st.session_state.y_train.name]
+    if active_df is not None:
+        corr_cols = [c for c in model_cols if c in active_df.columns]
+        numeric_df = active_df[corr_cols].select_dtypes(include=['number'])
+    else:
+        numeric_df = st.session_state.X_train.select_dtypes(include=['number'])
+    if dataset_info is not None and dataset_info.get('sample'):
+        st.caption(f"Dihitung dari sampel {dataset_info['sample']['n_sample']:,} baris")
     if len(numeric_df.columns) > 1:
         fig3, ax3 = plt.subplots(figsize=(10, 8))
         sns.heatmap(numeric_df.corr(), annot=True, fmt='.2f', ax=ax3, cmap='viridis')
@@ -71,7 +93,9 @@ def render_visualization_page():
     
     # Generate feature importance if not already in session state
     if not hasattr(st.session_state, 'feature_importances') or st.session_state.feature_importances is None:
-        importance_df = get_feature_importance(pipeline)
+        importance_df = get_feature_importance(
+            pipeline, st.session_state.X_test, st.session_state.y_test
+        )
         if importance_df is not None:
             st.session_state.feature_importances = importance_df
     
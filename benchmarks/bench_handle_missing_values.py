@@ -0,0 +1,151 @@
+"""
+Benchmark missing-value handling against the former per-column loop
+
+The app fills the target with fill_missing_target and imputes the
+features with the MissingValueImputer pipeline step; both use
+compute_fill_values/apply_fill_values.
+
+Usage:
+    python benchmarks/bench_handle_missing_values.py --rows 1000000 --cols 120
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import MISSING_STRATEGIES
+from ml_models.preprocessing import (
+    MissingValueImputer,
+    fill_missing_target,
+    is_numeric_column,
+    project_columns
+)
+
+
+def handle_missing_values_loop(df, feature_cols, target_col, strategy='drop rows'):
+    """Former implementation: one mean/median/mode and fillna per column"""
+    df_proc = df[list(dict.fromkeys(feature_cols + [target_col]))].copy()
+    
+    if strategy == 'drop rows':
+        return df_proc.dropna(subset=feature_cols + [target_col])
+    
+    if strategy in ('fill numeric mean', 'fill numeric median'):
+        for c in feature_cols:
+            if is_numeric_column(df_proc[c].dtype):
+                stat = df_proc[c].mean() if strategy == 'fill numeric mean' else df_proc[c].median()
+                df_proc[c] = df_proc[c].fillna(stat)
+            else:
+                mode_val = df_proc[c].mode()
+                df_proc[c] = df_proc[c].fillna(
+                    mode_val.iloc[0] if len(mode_val) > 0 else 'unknown'
+                )
+        target = df_proc[target_col]
+        stat = target.mean() if strategy == 'fill numeric mean' else target.median()
+        df_proc[target_col] = target.fillna(stat)
+        return df_proc
+    
+    for c in df_proc.columns:
+        if is_numeric_column(df_proc[c].dtype):
+            df_proc[c] = df_proc[c].fillna(0)
+        elif df_proc[c].isna().any():
+            if df_proc[c].dtype.name == 'category' and '0' not in df_proc[c].cat.categories:
+                df_proc[c] = df_proc[c].cat.add_categories(['0'])
+            df_proc[c] = df_proc[c].fillna('0')
+    return df_proc
+
+
+def handle_missing_values_pipeline(df, feature_cols, target_col, strategy='drop rows'):
+    """Current path: fill_missing_target, then MissingValueImputer on the features"""
+    df_proc = fill_missing_target(project_columns(df, feature_cols, target_col), target_col, strategy)
+    if strategy == 'drop rows':
+        return df_proc
+    X = MissingValueImputer(strategy).fit_transform(df_proc[feature_cols])
+    X[target_col] = df_proc[target_col]
+    return X
+
+
+def make_frame(n_rows, n_cols, missing_rate, missing_cols, seed):
+    """
+    Synthetic frame: 80% float32 columns, 10% category, 10% text, plus a
+    target; a missing_cols fraction of each kind has missing values
+    """
+    rng = np.random.default_rng(seed)
+    n_cat = max(n_cols // 10, 1)
+    n_text = max(n_cols // 10, 1)
+    n_num = n_cols - n_cat - n_text
+    
+    def missing(i, n):
+        if i >= round(n * missing_cols):
+            return np.zeros(n_rows, dtype=bool)
+        return rng.random(n_rows) < missing_rate
+    
+    columns = {}
+    for i in range(n_num):
+        values = rng.normal(size=n_rows).astype(np.float32)
+        values[missing(i, n_num)] = np.nan
+        columns[f"num_{i}"] = values
+    labels = np.array([f"level_{k}" for k in range(20)], dtype=object)
+    for i in range(n_cat):
+        codes = rng.integers(0, len(labels), n_rows)
+        codes[missing(i, n_cat)] = -1
+        columns[f"cat_{i}"] = pd.Categorical.from_codes(codes, categories=labels)
+    for i in range(n_text):
+        values = labels[rng.integers(0, len(labels), n_rows)]
+        values[missing(i, n_text)] = None
+        columns[f"text_{i}"] = values
+    target = rng.normal(300, 50, n_rows)
+    target[rng.random(n_rows) < missing_rate] = np.nan
+    columns['target'] = target
+    return pd.DataFrame(columns)
+
+
+def best_time(func, repeat):
+    """Fastest of repeat runs in seconds, with the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--cols', type=int, default=120)
+    parser.add_argument('--missing-rate', type=float, default=0.05,
+                        help='fraction of missing values in a column with missing values')
+    parser.add_argument('--missing-cols', type=float, default=1.0,
+                        help='fraction of columns that have missing values')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    df = make_frame(args.rows, args.cols, args.missing_rate, args.missing_cols, args.seed)
+    feature_cols = [c for c in df.columns if c != 'target']
+    print(f"{args.rows:,} rows x {len(feature_cols)} features, "
+          f"{df.memory_usage(deep=True).sum() / 1024 ** 2:.0f} MB, "
+          f"{args.missing_cols:.0%} of columns with missing values")
+    print(f"{'strategy':<24}{'loop (s)':>10}{'pipeline (s)':>16}{'speedup':>9}  identical")
+    
+    for strategy in MISSING_STRATEGIES:
+        loop_time, expected = best_time(
+            lambda: handle_missing_values_loop(df, feature_cols, 'target', strategy), args.repeat
+        )
+        pipeline_time, result = best_time(
+            lambda: handle_missing_values_pipeline(df, feature_cols, 'target', strategy), args.repeat
+        )
+        identical = expected.equals(result) and (expected.dtypes == result.dtypes).all()
+        del expected, result
+        print(f"{strategy:<24}{loop_time:>10.3f}{pipeline_time:>16.3f}"
+              f"{loop_time / pipeline_time:>8.1f}x  {identical}")
+
+
+if __name__ == '__main__':
+    main()
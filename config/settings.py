@@ -30,6 +30,110 @@ DEFAULT_MIN_SAMPLES_LEAF = 2
 # File constraints
 MAX_FILE_SIZE_MB = 200
 
+# Dataset cache (parsed uploads keyed by content hash, LRU eviction)
+DATASET_CACHE_MAX_MB = 1024
+
+# Preprocessing cache (X/y per dataset, features and strategy, LRU eviction)
+PREPROCESS_CACHE_MAX_MB = 512
+
+# Chunked CSV ingestion
+CSV_CHUNK_ROWS = 100_000
+CATEGORY_MAX_UNIQUE = 50
+
+# Multi-file ingestion (None = one worker process per CPU). Folders are
+# only read below MULTI_INGEST_ROOT; None turns the folder source off
+MULTI_INGEST_ROOT = None
+MULTI_INGEST_SUFFIXES = ('.csv', '.csv.gz', '.csv.zst')
+MULTI_INGEST_PATTERN = '*.csv*'
+MULTI_INGEST_MAX_WORKERS = None
+MP_START_METHOD = 'spawn'
+
+# Background training jobs: cores shared by all sessions (None = every
+# usable core), jobs running at the same time (at most one per core;
+# each gets an equal share of the cores, later jobs queue), page
+# refresh interval and how long a finished job nobody picked up (tab
+# closed, session expired) keeps its result
+TRAINING_CPU_CORES = None
+TRAINING_MAX_CONCURRENT_JOBS = 2
+TRAINING_POLL_SECONDS = 0.5
+TRAINING_JOB_TTL_SECONDS = 3600
+
+# Hyperparameter search: successive halving over the slider ranges
+# (max_depth 0 = None); every rung keeps 1/factor of the candidates
+# and multiplies their rows and trees by factor
+SEARCH_PARAM_RANGES = {
+    'max_depth': (0, 50),
+    'min_samples_split': (2, 20),
+    'min_samples_leaf': (1, 20)
+}
+SEARCH_N_CANDIDATES = 27
+SEARCH_HALVING_FACTOR = 3
+SEARCH_MIN_TREES = 10
+SEARCH_MAX_TREES = 200
+SEARCH_MIN_ROWS = 200
+SEARCH_VALIDATION_SIZE = 0.2
+SEARCH_DEFAULT_BUDGET_SECONDS = 60
+
+# Model engines: Random Forest, or histogram-binned gradient boosting
+# with native categorical splits (ordinal encoding) and early stopping
+# on a validation part of the training rows
+MODEL_ENGINES = ['random forest', 'hist gradient boosting']
+HGB_LEARNING_RATE = 0.1
+HGB_MAX_LEAF_NODES = 31
+HGB_MAX_BINS = 255
+HGB_VALIDATION_FRACTION = 0.1
+HGB_N_ITER_NO_CHANGE = 10
+HGB_PROGRESS_ITERATIONS = 20
+PERMUTATION_IMPORTANCE_MAX_ROWS = 10_000
+
+# OOB-convergence early stopping: trees are added OOB_STOP_BATCH_TREES
+# at a time until the best out-of-bag MAE so far improved by less than
+# OOB_STOP_TOLERANCE (relative) per batch over OOB_STOP_PATIENCE batches
+OOB_STOP_BATCH_TREES = 25
+OOB_STOP_MIN_TREES = 50
+OOB_STOP_TOLERANCE = 0.001
+OOB_STOP_PATIENCE = 3
+
+# Progressive mode: a small, shallow preview forest on a subsample of
+# the training split (stratified by target quantiles) is live until
+# the full model is trained
+PREVIEW_ROWS = 2000
+PREVIEW_N_ESTIMATORS = 20
+PREVIEW_MAX_DEPTH = 8
+PREVIEW_STRATA = 10
+
+# Time-budgeted training: a pilot forest on a row sample prices
+# preprocessing, trees and prediction; the plan keeps the slider's
+# trees when they fit, else lowers trees to BUDGET_MIN_TREES, then the
+# bootstrap sample (max_samples) to BUDGET_MIN_SAMPLES, then trees again
+BUDGET_DEFAULT_SECONDS = 30
+BUDGET_PILOT_ROWS = 5000
+BUDGET_PILOT_TREES_PER_CORE = 2
+BUDGET_MIN_TREES = 50
+BUDGET_MIN_SAMPLES = 0.05
+BUDGET_SAFETY = 0.9
+
+# Model evaluation: one train/test split, K-fold cross-validation of
+# the same configuration on top of the hold-out model, or out-of-bag
+# predictions of a forest trained on all rows
+EVALUATION_MODES = ['hold-out', 'k-fold CV', 'out-of-bag']
+CV_DEFAULT_FOLDS = 5
+
+# Sampling mode for datasets larger than memory; stratification
+# choices come from the first STRATIFY_PEEK_ROWS rows of the file
+SAMPLE_DEFAULT_ROWS = 100_000
+STRATIFY_PEEK_ROWS = 10_000
+
+# Streaming statistics for out-of-core imputation (utils.streaming_stats)
+STREAM_QUANTILE_K = 2048
+STREAM_HEAVY_HITTERS = 256
+
+# Column profile: most frequent categories kept per column
+PROFILE_TOP_CATEGORIES = 50
+
+# Columnar store: datasets kept as Arrow IPC files, reopened memory-mapped
+COLUMNAR_STORE_DIR = 'data_store'
+
 # Feature priority list
 EXCLUDE_COLUMNS = ['ID', 'Dream Weight']
 PRIORITY_WEIGHT_FEATURES = ['actual', 'weight']
@@ -45,3 +149,19 @@ MISSING_STRATEGIES = [
     'fill with constant (0)'
 ]
 
+# Categorical encoding modes ('auto' picks one from the column profile)
+ENCODING_MODES = [
+    'auto',
+    'one-hot dense',
+    'one-hot sparse',
+    'ordinal',
+    'top-k + other'
+]
+ENCODING_TOP_K = 20
+# 'auto' keeps dense one-hot up to this many encoded columns, else ordinal
+ENCODING_DENSE_MAX_COLUMNS = 64
+
+# Dtype of the encoded feature matrix; the forest works in float32, so
+# producing it directly avoids a float64 copy per fit and predict
+FEATURE_DTYPE = 'float32'
+
@@ -0,0 +1,6 @@
+"""
+pytest configuration for ForestCal
+
+Being at the repository root, this file puts the root on sys.path, so
+tests import config, ml_models and utils like the app does.
+"""
@@ -3,11 +3,15 @@ Machine Learning models for ForestCal application
 """
 
 from .preprocessing import preprocess_data
+from .preprocessing_cache import preprocess_data_cached
 from .training import train_model, evaluate_model
+from .training_jobs import get_training_executor
 
 __all__ = [
     'preprocess_data',
+    'preprocess_data_cached',
     'train_model',
-    'evaluate_model'
+    'evaluate_model',
+    'get_training_executor'
 ]
 
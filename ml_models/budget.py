@@ -0,0 +1,181 @@
+"""
+Time-budgeted Random Forest training for ForestCal application
+"""
+import time
+
+import numpy as np
+from joblib import effective_n_jobs
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split
+from config.settings import (
+    BUDGET_PILOT_ROWS,
+    BUDGET_PILOT_TREES_PER_CORE,
+    BUDGET_MIN_TREES,
+    BUDGET_MIN_SAMPLES,
+    BUDGET_SAFETY
+)
+from ml_models.training import create_forest, train_model, TrainingCancelled
+
+
+def pilot_costs(X_train, y_train, preprocessor, max_depth=20, min_samples_split=5,
+                min_samples_leaf=2, random_state=42):
+    """
+    Time small forests on row samples to price the full fit
+    
+    Fitting one tree costs a fixed overhead plus a share per row; two
+    pilot forests, on the sample and on a quarter of it, give both.
+    
+    Args:
+        X_train: training features
+        y_train: training target
+        preprocessor: unfitted preprocessing pipeline (not modified)
+        max_depth, min_samples_split, min_samples_leaf: forest
+            hyperparameters (see train_model)
+        random_state: seed for the row sample and the forest
+        
+    Returns:
+        dict: seconds on all cores per row for preprocessing
+        ('preprocess'), per tree ('tree') and per tree and row ('row')
+        for fitting, per tree and row for predicting ('predict'), plus
+        'pilot_seconds'
+    """
+    start = time.perf_counter()
+    n_rows = min(BUDGET_PILOT_ROWS, len(y_train))
+    rows = np.random.default_rng(random_state).choice(len(y_train), n_rows, replace=False)
+    X_pilot, y_pilot = X_train.iloc[rows], y_train.iloc[rows]
+    
+    tick = time.perf_counter()
+    Xt = clone(preprocessor).fit_transform(X_pilot, y_pilot)
+    preprocess_seconds = time.perf_counter() - tick
+    
+    n_trees = BUDGET_PILOT_TREES_PER_CORE * effective_n_jobs(-1)
+    tree_seconds = {}
+    for n in (max(n_rows // 4, 1), n_rows):
+        model = create_forest(n_trees, max_depth, min_samples_split, min_samples_leaf, random_state)
+        tick = time.perf_counter()
+        model.fit(Xt[:n], y_pilot.iloc[:n])
+        tree_seconds[n] = (time.perf_counter() - tick) / n_trees
+    
+    tick = time.perf_counter()
+    model.predict(Xt)
+    predict_seconds = time.perf_counter() - tick
+    
+    (n_small, small), (n_large, large) = sorted(tree_seconds.items())
+    row_seconds = max(large - small, 0.0) / (n_large - n_small) if n_large > n_small else 0.0
+    return {
+        'preprocess': preprocess_seconds / n_rows,
+        'tree': max(large - row_seconds * n_large, 0.0),
+        'row': row_seconds,
+        'predict': predict_seconds / (n_trees * n_rows),
+        'pilot_seconds': time.perf_counter() - start
+    }
+
+
+def plan_budget(costs, n_train, n_test, n_estimators, time_budget):
+    """
+    Choose the tree count and bootstrap sample size for a time budget
+    
+    Trees are lowered first (down to BUDGET_MIN_TREES), then the
+    bootstrap sample (down to BUDGET_MIN_SAMPLES of the rows), then the
+    trees again; only BUDGET_SAFETY of the budget is planned for.
+    
+    Args:
+        costs: dict returned by pilot_costs
+        n_train: training rows
+        n_test: test rows
+        n_estimators: trees wanted (the most the plan uses)
+        time_budget: seconds for the train_model run
+        
+    Returns:
+        tuple: (n_estimators, max_samples fraction or None for all
+        rows, estimated seconds of the train_model run)
+    """
+    fixed = costs['preprocess'] * (n_train + n_test)
+    available = time_budget * BUDGET_SAFETY - fixed
+    
+    def tree_seconds(fraction):
+        n_rows = max(int(round(fraction * n_train)), 1)
+        return costs['tree'] + costs['row'] * n_rows + costs['predict'] * n_test
+    
+    def estimate(n_trees, fraction):
+        return fixed + n_trees * tree_seconds(fraction)
+    
+    n_trees = int(available // tree_seconds(1.0)) if available > 0 else 0
+    if n_trees >= n_estimators:
+        return n_estimators, None, estimate(n_estimators, 1.0)
+    if n_trees >= BUDGET_MIN_TREES:
+        return n_trees, None, estimate(n_trees, 1.0)
+    
+    # Largest bootstrap fraction that fits BUDGET_MIN_TREES trees
+    n_trees = min(n_estimators, BUDGET_MIN_TREES)
+    low, high = BUDGET_MIN_SAMPLES, 1.0
+    if n_trees * tree_seconds(low) <= available:
+        for _ in range(30):
+            middle = (low + high) / 2
+            if n_trees * tree_seconds(middle) <= available:
+                low = middle
+            else:
+                high = middle
+        return n_trees, low, estimate(n_trees, low)
+    
+    n_trees = int(available // tree_seconds(low)) if available > 0 else 0
+    n_trees = max(n_trees, 1)
+    return n_trees, low, estimate(n_trees, low)
+
+
+def train_within_budget(X, y, preprocessor, time_budget, train_size=0.8, random_state=42,
+                        n_estimators=500, max_depth=20, min_samples_split=5,
+                        min_samples_leaf=2, progress_callback=None):
+    """
+    Train the Random Forest within a wall-clock budget
+    
+    A pilot fit (pilot_costs) prices the run, plan_budget picks
+    n_estimators and max_samples, and train_model runs with them on
+    the usual split.
+    
+    Args:
+        X, y, preprocessor, train_size, random_state, max_depth,
+        min_samples_split, min_samples_leaf: see train_model
+        time_budget: seconds for the train_model run
+        n_estimators: trees wanted (the most the plan uses)
+        progress_callback: optional callable(n_done, n_total) over
+            trees (see train_model)
+            
+    Returns:
+        dict: train_model result plus 'budget' with 'time_budget',
+        'pilot_seconds', 'estimated_seconds', 'actual_seconds' (the
+        train_model run), 'n_estimators' and 'max_samples'
+        
+    Raises:
+        TrainingCancelled: when progress_callback returns False
+    """
+    progress_callback = progress_callback or (lambda n_done, n_total: True)
+    if not progress_callback(0, n_estimators):
+        raise TrainingCancelled()
+    
+    # Same split as train_model
+    X_train, X_test, y_train, _ = train_test_split(
+        X, y, train_size=train_size, random_state=random_state
+    )
+    costs = pilot_costs(
+        X_train, y_train, preprocessor, max_depth, min_samples_split, min_samples_leaf,
+        random_state
+    )
+    n_trees, max_samples, estimated_seconds = plan_budget(
+        costs, len(X_train), len(X_test), n_estimators, time_budget
+    )
+    
+    start = time.perf_counter()
+    result = train_model(
+        X, y, preprocessor, train_size, random_state, n_trees, max_depth,
+        min_samples_split, min_samples_leaf, progress_callback, max_samples=max_samples
+    )
+    result['budget'] = {
+        'time_budget': time_budget,
+        'pilot_seconds': costs['pilot_seconds'],
+        'estimated_seconds': float(estimated_seconds),
+        'actual_seconds': time.perf_counter() - start,
+        'n_estimators': n_trees,
+        'max_samples': max_samples
+    }
+    return result
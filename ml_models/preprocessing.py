@@ -3,54 +3,243 @@ Data preprocessing functions for ForestCal application
 """
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.base import BaseEstimator, TransformerMixin, OneToOneFeatureMixin
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder, FunctionTransformer
 from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.utils.validation import check_is_fitted
+from config.settings import ENCODING_TOP_K, ENCODING_DENSE_MAX_COLUMNS, FEATURE_DTYPE
 
 
-def handle_missing_values(df, feature_cols, target_col, strategy='drop rows'):
+def is_numeric_column(dtype):
     """
-    Handle missing values in the dataset
+    Check whether a column dtype is numeric (bool and category excluded)
+    
+    Args:
+        dtype: pandas or numpy dtype
+        
+    Returns:
+        bool
+    """
+    return isinstance(dtype, np.dtype) and np.issubdtype(dtype, np.number)
+
+
+def project_columns(df, feature_cols, target_col):
+    """
+    Build a new frame holding only the feature and target columns
     
     Args:
         df: pandas DataFrame
         feature_cols: list of feature column names
         target_col: target column name
-        strategy: missing value strategy
         
     Returns:
         pandas DataFrame
     """
-    df_proc = df.copy()
+    columns = list(dict.fromkeys(list(feature_cols) + [target_col]))
+    return df.reindex(columns=columns)
+
+
+def _dtype_groups(df, columns):
+    """Group column names by dtype, keeping their order"""
+    groups = {}
+    for c in columns:
+        groups.setdefault(df[c].dtype, []).append(c)
+    return groups
+
+
+def _numeric_medians(df, columns):
+    """
+    Median of numeric columns, one 2-D sort per dtype
     
-    if strategy == 'drop rows':
-        df_proc = df_proc.dropna(subset=feature_cols + [target_col])
+    Each dtype group is read as one column-major array (integers as
+    float64, as pandas does) and sorted along the columns at once;
+    missing values sort last, so each column's median is read from the
+    middle of its non-missing values. Results equal Series.median().
+    
+    Args:
+        df: pandas DataFrame
+        columns: list of numeric column names
         
-    elif strategy == 'fill numeric mean':
-        for c in feature_cols:
-            if np.issubdtype(df_proc[c].dtype, np.number):
-                df_proc[c] = df_proc[c].fillna(df_proc[c].mean())
-            else:
-                mode_val = df_proc[c].mode()
-                df_proc[c] = df_proc[c].fillna(
-                    mode_val.iloc[0] if len(mode_val) > 0 else 'unknown'
-                )
-        df_proc[target_col] = df_proc[target_col].fillna(df_proc[target_col].mean())
-        
-    elif strategy == 'fill numeric median':
+    Returns:
+        dict: column -> median (NaN for all-missing columns)
+    """
+    medians = {}
+    for dtype, cols in _dtype_groups(df, columns).items():
+        values = np.asfortranarray(
+            df[cols].to_numpy(dtype=np.float64 if dtype.kind in 'iub' else dtype)
+        )
+        n_valid = values.shape[0] - np.count_nonzero(np.isnan(values), axis=0)
+        ordered = np.sort(values, axis=0)
+        idx = np.arange(len(cols))
+        low = ordered[np.maximum(n_valid - 1, 0) // 2, idx]
+        high = ordered[np.maximum(n_valid, 1) // 2 - (n_valid == 0), idx]
+        result = np.where(n_valid > 0, (low + high) / 2, np.nan).astype(values.dtype)
+        medians.update(zip(cols, result))
+    return medians
+
+
+def compute_fill_values(df, feature_cols, target_col=None, strategy='drop rows'):
+    """
+    Compute the value each column is filled with under a strategy
+    
+    Numeric medians come from one 2-D sort per dtype (_numeric_medians),
+    which is where a block pass beats pandas; means and modes are
+    memory-bound and stay per column.
+    
+    Args:
+        df: pandas DataFrame holding the feature and target columns
+        feature_cols: list of feature column names
+        target_col: target column name (None = features only)
+        strategy: missing value strategy
+        
+    Returns:
+        dict: column -> fill value (empty for 'drop rows')
+    """
+    if strategy == 'drop rows':
+        return {}
+    
+    if strategy in ('fill numeric mean', 'fill numeric median'):
+        fill_values = {}
         for c in feature_cols:
-            if np.issubdtype(df_proc[c].dtype, np.number):
-                df_proc[c] = df_proc[c].fillna(df_proc[c].median())
-            else:
-                mode_val = df_proc[c].mode()
-                df_proc[c] = df_proc[c].fillna(
-                    mode_val.iloc[0] if len(mode_val) > 0 else 'unknown'
-                )
-        df_proc[target_col] = df_proc[target_col].fillna(df_proc[target_col].median())
+            if not is_numeric_column(df[c].dtype):
+                mode_val = df[c].mode()
+                fill_values[c] = mode_val.iloc[0] if len(mode_val) > 0 else 'unknown'
+        stat_cols = [c for c in feature_cols if c not in fill_values]
+        if target_col is not None:
+            stat_cols = list(dict.fromkeys(stat_cols + [target_col]))
+        
+        if strategy == 'fill numeric mean':
+            fill_values.update({c: df[c].mean() for c in stat_cols})
+        else:
+            numeric_cols = [c for c in stat_cols if is_numeric_column(df[c].dtype)]
+            fill_values.update(_numeric_medians(df, numeric_cols))
+            # Non-numeric target: same reduction as a single Series
+            fill_values.update({c: df[c].median() for c in stat_cols if c not in numeric_cols})
+        return fill_values
+    
+    # fill with constant (0)
+    # Text/category columns get '0' so encoders never see mixed types
+    fill_values = {}
+    columns = feature_cols + ([target_col] if target_col is not None else [])
+    for c in dict.fromkeys(columns):
+        if is_numeric_column(df[c].dtype):
+            fill_values[c] = 0
+        else:
+            fill_values[c] = '0'
+    return fill_values
+
+
+def apply_fill_values(df, fill_values):
+    """
+    Fill missing values of several columns with one fillna call
+    
+    Category columns with missing values get the fill value added to
+    their categories when needed. Under copy-on-write, columns without
+    missing values come back uncopied, so fill_values may cover every
+    column.
+    
+    Args:
+        df: pandas DataFrame
+        fill_values: dict column -> fill value, e.g. from
+            compute_fill_values
+            
+    Returns:
+        pandas DataFrame
+    """
+    if not fill_values:
+        return df
+    
+    df = df.copy(deep=False)
+    for c, value in fill_values.items():
+        if (isinstance(df[c].dtype, pd.CategoricalDtype) and value not in df[c].cat.categories
+                and df[c].hasnans):
+            df[c] = df[c].cat.add_categories([value])
+    return df.fillna(fill_values)
+
+
+class MissingValueImputer(OneToOneFeatureMixin, TransformerMixin, BaseEstimator):
+    """
+    Pipeline step applying a MISSING_STRATEGIES strategy to features
+    
+    fit learns one fill value per feature (compute_fill_values) from the
+    training rows and stores them in fill_values_, so new data is
+    imputed the same way inside pipeline.predict. Rows cannot be dropped
+    at prediction time: with 'drop rows' the incomplete training rows
+    are removed before fitting, and scoring falls back to the median
+    (numeric) or mode (other) of the training rows.
+    
+    Args:
+        strategy: one of MISSING_STRATEGIES
+        fill_values: optional precomputed dict column -> fill value (e.g.
+            from utils.streaming_stats.streaming_fill_values, for data
+            that is never loaded into memory); fit then keeps them
+            instead of computing statistics on X. They must come from
+            training rows only, or the held-out rows leak into the
+            imputation
+    """
+    
+    def __init__(self, strategy='drop rows', fill_values=None):
+        self.strategy = strategy
+        self.fill_values = fill_values
+    
+    def fit(self, X, y=None):
+        """
+        Learn fill values from the training features
         
-    else:  # fill with constant (0)
-        df_proc = df_proc.fillna(0)
+        Args:
+            X: features DataFrame
+            y: ignored
+            
+        Returns:
+            self
+        """
+        strategy = 'fill numeric median' if self.strategy == 'drop rows' else self.strategy
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = len(X.columns)
+        if self.fill_values is not None:
+            self.fill_values_ = dict(self.fill_values)
+        else:
+            self.fill_values_ = compute_fill_values(X, list(X.columns), None, strategy)
+        return self
     
-    return df_proc
+    def transform(self, X):
+        """
+        Fill missing values with the learned values
+        
+        Args:
+            X: features DataFrame with the columns seen in fit
+            
+        Returns:
+            pandas DataFrame
+        """
+        check_is_fitted(self, 'fill_values_')
+        fill_values = {c: v for c, v in self.fill_values_.items() if c in X.columns}
+        return apply_fill_values(X, fill_values)
+
+
+def fill_missing_target(df, target_col, strategy='drop rows'):
+    """
+    Fill or drop rows with a missing target
+    
+    The target is not part of the model pipeline, so it is handled on
+    the frame before training: 'drop rows' drops incomplete rows, the
+    fill strategies fill the target with its mean, median or 0.
+    
+    Args:
+        df: DataFrame with the feature and target columns
+        target_col: target column name
+        strategy: missing value strategy
+        
+    Returns:
+        pandas DataFrame
+    """
+    if strategy == 'drop rows':
+        return df.dropna()
+    if not df[target_col].hasnans:
+        return df
+    fill_values = compute_fill_values(df[[target_col]], [], target_col, strategy)
+    return apply_fill_values(df, fill_values)
 
 
 def prepare_features_target(df_proc, feature_cols, target_col):
@@ -69,9 +258,9 @@ def prepare_features_target(df_proc, feature_cols, target_col):
     df_proc[target_col] = pd.to_numeric(df_proc[target_col], errors='coerce')
     df_proc = df_proc.dropna(subset=[target_col])
     
-    # Split features and target
-    y = df_proc[target_col].copy()
-    X = df_proc[feature_cols].copy()
+    # Split features and target (copy-on-write, no eager copies)
+    y = df_proc[target_col]
+    X = df_proc[feature_cols]
     
     return X, y, df_proc
 
@@ -92,77 +281,226 @@ def identify_feature_types(X):
     return numeric_features, categorical_features
 
 
-def create_preprocessor(numeric_features, categorical_features, use_scaling=False):
+def create_categorical_encoder(encoding='one-hot dense', top_k=ENCODING_TOP_K, dtype=None):
+    """
+    Create the encoder for categorical features
+    
+    Args:
+        encoding: one of ENCODING_MODES except 'auto'
+        top_k: categories kept per column by 'top-k + other'
+        dtype: output dtype (None = float64)
+        
+    Returns:
+        sklearn transformer
+    """
+    dtype = dtype or np.float64
+    if encoding == 'one-hot sparse':
+        return OneHotEncoder(handle_unknown='ignore', sparse_output=True, dtype=dtype)
+    if encoding == 'ordinal':
+        # Trees split on the codes directly; unseen categories get -1
+        return OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1, dtype=dtype)
+    if encoding == 'top-k + other':
+        # The less frequent categories share one 'infrequent' column
+        return OneHotEncoder(
+            handle_unknown='infrequent_if_exist',
+            max_categories=top_k + 1,
+            sparse_output=False,
+            dtype=dtype
+        )
+    return OneHotEncoder(handle_unknown='ignore', sparse_output=False, dtype=dtype)
+
+
+def create_dtype_cast(dtype):
+    """
+    Create a stateless transformer converting its input to a
+    C-contiguous array of dtype
+    
+    Args:
+        dtype: target dtype, e.g. 'float32'
+        
+    Returns:
+        FunctionTransformer (keeps feature names)
+    """
+    return FunctionTransformer(
+        np.ascontiguousarray, kw_args={'dtype': dtype}, feature_names_out='one-to-one'
+    )
+
+
+def choose_encoding(profile, categorical_features):
+    """
+    Pick an encoding mode from the column cardinality profile
+    
+    Dense one-hot is kept while it adds at most
+    ENCODING_DENSE_MAX_COLUMNS columns; wider encodings switch to
+    ordinal codes, which trees split on without any expansion.
+    
+    Args:
+        profile: column profile from build_column_profile
+        categorical_features: list of categorical feature names
+        
+    Returns:
+        str: encoding mode
+    """
+    n_columns = int(profile.loc[categorical_features, 'n_unique'].sum()) if categorical_features else 0
+    return 'one-hot dense' if n_columns <= ENCODING_DENSE_MAX_COLUMNS else 'ordinal'
+
+
+def estimate_encoded_size(n_rows, numeric_features, categorical_features, profile,
+                          top_k=ENCODING_TOP_K, dtype=FEATURE_DTYPE):
+    """
+    Estimate the encoded feature matrix for every encoding mode
+    
+    Cardinalities come from the column profile. Dense matrices hold
+    values of dtype; sparse one-hot is CSR with one stored value per
+    numeric feature and per categorical feature in each row.
+    
+    Args:
+        n_rows: number of rows
+        numeric_features: list of numeric feature names
+        categorical_features: list of categorical feature names
+        profile: column profile from build_column_profile
+        top_k: categories kept per column by 'top-k + other'
+        dtype: dtype of the encoded values (None = float64)
+        
+    Returns:
+        pandas DataFrame indexed by mode with 'n_columns' and 'size_mb'
+    """
+    cardinality = profile.loc[categorical_features, 'n_unique'].astype(int)
+    n_num = len(numeric_features)
+    n_columns = {
+        'one-hot dense': n_num + int(cardinality.sum()),
+        'one-hot sparse': n_num + int(cardinality.sum()),
+        'ordinal': n_num + len(categorical_features),
+        'top-k + other': n_num + int(cardinality.clip(upper=top_k + 1).sum())
+    }
+    itemsize = np.dtype(dtype or np.float64).itemsize
+    n_bytes = {mode: n_rows * n * itemsize for mode, n in n_columns.items()}
+    nnz = n_rows * (n_num + len(categorical_features))
+    n_bytes['one-hot sparse'] = nnz * (itemsize + 4) + (n_rows + 1) * 4
+    
+    sizes = pd.DataFrame({
+        'n_columns': pd.Series(n_columns),
+        'size_mb': pd.Series(n_bytes) / (1024 * 1024)
+    })
+    sizes.index.name = 'mode'
+    return sizes
+
+
+def create_preprocessor(numeric_features, categorical_features, use_scaling=False,
+                        missing_strategy=None, fill_values=None, encoding='one-hot dense',
+                        dtype=None):
     """
     Create preprocessing pipeline
     
+    With a dtype every branch produces that dtype itself (numeric
+    columns are cast before scaling), so the stacked matrix is built
+    once in the final dtype instead of as float64 and converted again
+    by the model on every fit and predict.
+    
     Args:
         numeric_features: list of numeric feature names
         categorical_features: list of categorical feature names
         use_scaling: whether to apply StandardScaler
+        missing_strategy: when given, a fitted MissingValueImputer with
+            this strategy runs before encoding
+        fill_values: optional precomputed fill values for the imputer
+        encoding: categorical encoding mode (see create_categorical_encoder)
+        dtype: dtype of the encoded matrix, e.g. 'float32' (None = as
+            produced by the encoders, float64)
         
     Returns:
-        ColumnTransformer or str ('passthrough')
+        Pipeline (with imputer), ColumnTransformer or str ('passthrough')
     """
     transformers = []
     
     if categorical_features:
         transformers.append((
             "cat",
-            OneHotEncoder(handle_unknown='ignore', sparse_output=False),
+            create_categorical_encoder(encoding, dtype=dtype),
             categorical_features
         ))
     
     if numeric_features and use_scaling:
+        scaler = StandardScaler()
+        if dtype is not None:
+            # StandardScaler keeps float32 input in float32
+            scaler = Pipeline(steps=[('cast', create_dtype_cast(dtype)), ('scaler', scaler)])
         transformers.append((
             "num",
-            StandardScaler(),
+            scaler,
             numeric_features
         ))
     
     if transformers:
-        return ColumnTransformer(transformers=transformers, remainder='passthrough')
+        encoder = ColumnTransformer(
+            transformers=transformers,
+            remainder='passthrough' if dtype is None else create_dtype_cast(dtype),
+            # Keep sparse one-hot output sparse after stacking
+            sparse_threshold=1.0 if encoding == 'one-hot sparse' else 0.3
+        )
+    elif dtype is not None:
+        encoder = create_dtype_cast(dtype)
     else:
-        return 'passthrough'
+        encoder = 'passthrough'
+    
+    if missing_strategy is None:
+        return encoder
+    return Pipeline(steps=[
+        ('imputer', MissingValueImputer(missing_strategy, fill_values)),
+        ('encoder', encoder)
+    ])
 
 
-def preprocess_data(df, feature_cols, target_col, missing_strategy='drop rows', use_scaling=False):
+def preprocess_data(df, feature_cols, target_col, missing_strategy='drop rows', use_scaling=False,
+                    fill_values=None, encoding='one-hot dense', dtype=None):
     """
     Complete preprocessing pipeline
     
+    Missing features are imputed by the MissingValueImputer step of the
+    returned preprocessor, so the fill values are learned on the
+    training split and stored with the model. Only the target is
+    filled here ('drop rows' still drops incomplete rows up front).
+    
     Args:
         df: raw DataFrame
         feature_cols: list of feature column names
         target_col: target column name
         missing_strategy: strategy for handling missing values
         use_scaling: whether to use StandardScaler
+        fill_values: optional precomputed feature fill values (see
+            MissingValueImputer)
+        encoding: categorical encoding mode (see create_categorical_encoder)
+        dtype: dtype of the encoded matrix (see create_preprocessor)
         
     Returns:
         dict: {
             'X': features DataFrame,
             'y': target Series,
-            'df_processed': processed DataFrame,
-            'preprocessor': preprocessing pipeline,
+            'preprocessor': unfitted preprocessing pipeline (imputer +
+                encoder),
             'numeric_features': list,
             'categorical_features': list
         }
     """
-    # Handle missing values
-    df_proc = handle_missing_values(df, feature_cols, target_col, missing_strategy)
+    # Handle missing target values (features are imputed in the pipeline)
+    df_proc = project_columns(df, feature_cols, target_col)
+    df_proc = fill_missing_target(df_proc, target_col, missing_strategy)
     
     # Prepare features and target
-    X, y, df_proc = prepare_features_target(df_proc, feature_cols, target_col)
+    X, y, _ = prepare_features_target(df_proc, feature_cols, target_col)
     
     # Identify feature types
     numeric_features, categorical_features = identify_feature_types(X)
     
     # Create preprocessor
-    preprocessor = create_preprocessor(numeric_features, categorical_features, use_scaling)
+    preprocessor = create_preprocessor(
+        numeric_features, categorical_features, use_scaling, missing_strategy, fill_values,
+        encoding, dtype
+    )
     
     return {
         'X': X,
         'y': y,
-        'df_processed': df_proc,
         'preprocessor': preprocessor,
         'numeric_features': numeric_features,
         'categorical_features': categorical_features
@@ -0,0 +1,195 @@
+"""
+Memoized preprocessing stage for ForestCal application
+"""
+import threading
+from collections import OrderedDict
+
+from sklearn.base import clone
+from config.settings import PREPROCESS_CACHE_MAX_MB
+from ml_models.preprocessing import preprocess_data
+
+
+def make_preprocess_key(dataset_key, feature_cols, target_col, missing_strategy, use_scaling,
+                        encoding='one-hot dense', dtype=None):
+    """
+    Build the cache key of one preprocessing run
+    
+    Args:
+        dataset_key: content hash of the dataset
+        feature_cols: list of feature column names (order matters)
+        target_col: target column name
+        missing_strategy: strategy for handling missing values
+        use_scaling: whether StandardScaler is used
+        encoding: categorical encoding mode
+        dtype: dtype of the encoded matrix
+        
+    Returns:
+        tuple: hashable key
+    """
+    return (
+        dataset_key, tuple(feature_cols), target_col, missing_strategy, bool(use_scaling),
+        encoding, dtype
+    )
+
+
+def _result_bytes(result):
+    """Memory held by the X/y frames of a preprocessing result"""
+    return int(
+        result['X'].memory_usage(deep=True).sum()
+        + result['y'].memory_usage(deep=True)
+    )
+
+
+def _fresh_result(result):
+    """
+    Copy of a stored result with an unfitted clone of the preprocessor
+    
+    Training fits the preprocessor in place, so the stored one is never
+    handed out. X and y are shared copy-on-write.
+    """
+    result = dict(result)
+    if not isinstance(result['preprocessor'], str):
+        result['preprocessor'] = clone(result['preprocessor'])
+    return result
+
+
+class PreprocessingCache:
+    """
+    LRU cache of preprocess_data results bounded by a byte budget
+    
+    Keys come from make_preprocess_key, so moving a model
+    hyperparameter slider reuses the previous X/y instead of reloading
+    and preprocessing the dataset again.
+    """
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """
+        Get a stored result and count a hit or miss
+        
+        Args:
+            key: key from make_preprocess_key
+            
+        Returns:
+            dict or None: preprocess_data result with a fresh preprocessor
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return _fresh_result(entry['result'])
+    
+    def put(self, key, result):
+        """
+        Store a result, evicting least recently used entries
+        
+        Args:
+            key: key from make_preprocess_key
+            result: dict returned by preprocess_data
+        """
+        nbytes = _result_bytes(result)
+        if nbytes > self.max_bytes:
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)['nbytes']
+            while self._entries and self.current_bytes + nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted['nbytes']
+            self._entries[key] = {'result': result, 'nbytes': nbytes}
+            self.current_bytes += nbytes
+    
+    def evict(self, dataset_key=None):
+        """
+        Remove stored results
+        
+        Args:
+            dataset_key: only remove results of this dataset (None = all)
+            
+        Returns:
+            int: number of removed entries
+        """
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if dataset_key is None or key[0] == dataset_key
+            ]
+            for key in keys:
+                self.current_bytes -= self._entries.pop(key)['nbytes']
+            return len(keys)
+    
+    def stats(self):
+        """
+        Summarize cache usage
+        
+        Returns:
+            dict: 'hits', 'misses', 'n_entries', 'bytes' and 'max_bytes'
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'n_entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+# Process-wide cache shared by all sessions
+_preprocess_cache = PreprocessingCache(PREPROCESS_CACHE_MAX_MB * 1024 * 1024)
+
+
+def get_preprocess_cache():
+    """Get the process-wide preprocessing cache"""
+    return _preprocess_cache
+
+
+def preprocess_data_cached(dataset_key, load_df, feature_cols, target_col,
+                           missing_strategy='drop rows', use_scaling=False,
+                           encoding='one-hot dense', dtype=None):
+    """
+    Run preprocess_data, reusing the stored result for unchanged inputs
+    
+    Args:
+        dataset_key: content hash of the dataset
+        load_df: callable returning the DataFrame to preprocess; only
+            called on a cache miss
+        feature_cols: list of feature column names
+        target_col: target column name
+        missing_strategy: strategy for handling missing values
+        use_scaling: whether to use StandardScaler
+        encoding: categorical encoding mode
+        dtype: dtype of the encoded matrix
+        
+    Returns:
+        tuple: (preprocess_data result dict, from_cache)
+    """
+    cache = get_preprocess_cache()
+    key = make_preprocess_key(
+        dataset_key, feature_cols, target_col, missing_strategy, use_scaling, encoding, dtype
+    )
+    result = cache.get(key)
+    if result is not None:
+        return result, True
+    
+    result = preprocess_data(
+        load_df(), feature_cols, target_col, missing_strategy, use_scaling,
+        encoding=encoding, dtype=dtype
+    )
+    cache.put(key, result)
+    return _fresh_result(result), False
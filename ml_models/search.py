@@ -0,0 +1,243 @@
+"""
+Successive-halving hyperparameter search for ForestCal application
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import ParameterSampler, train_test_split
+from config.settings import (
+    SEARCH_PARAM_RANGES,
+    SEARCH_N_CANDIDATES,
+    SEARCH_HALVING_FACTOR,
+    SEARCH_MIN_TREES,
+    SEARCH_MAX_TREES,
+    SEARCH_MIN_ROWS,
+    SEARCH_VALIDATION_SIZE,
+    SEARCH_DEFAULT_BUDGET_SECONDS
+)
+from ml_models.training import create_forest, train_model, TrainingCancelled
+
+
+def sample_candidates(n_candidates, random_state=42):
+    """
+    Draw hyperparameter candidates uniformly from SEARCH_PARAM_RANGES
+    
+    Args:
+        n_candidates: number of candidates
+        random_state: seed
+        
+    Returns:
+        list: dicts with max_depth (None for 0), min_samples_split and
+        min_samples_leaf
+    """
+    space = {
+        name: list(range(low, high + 1))
+        for name, (low, high) in SEARCH_PARAM_RANGES.items()
+    }
+    candidates = list(ParameterSampler(space, n_candidates, random_state=random_state))
+    for params in candidates:
+        if params['max_depth'] == 0:
+            params['max_depth'] = None
+    return candidates
+
+
+def halving_schedule(n_candidates, n_rows, max_trees, factor=SEARCH_HALVING_FACTOR):
+    """
+    Plan the rungs of a successive-halving search
+    
+    Each rung keeps 1/factor of the candidates and gives them factor
+    times the rows and trees; the last rung (at least factor
+    candidates) uses all rows and max_trees trees.
+    
+    Args:
+        n_candidates: candidates in the first rung
+        n_rows: rows available for fitting
+        max_trees: trees per candidate in the last rung
+        factor: halving factor
+        
+    Returns:
+        list: dicts with 'n_candidates', 'n_rows' and 'n_trees' per rung
+    """
+    counts = [n_candidates]
+    while counts[-1] // factor >= factor:
+        counts.append(counts[-1] // factor)
+    
+    schedule = []
+    for rung, count in enumerate(counts):
+        share = float(factor) ** (rung - len(counts) + 1)
+        schedule.append({
+            'n_candidates': count,
+            'n_rows': min(max(int(n_rows * share), SEARCH_MIN_ROWS), n_rows),
+            'n_trees': max(int(round(max_trees * share)), SEARCH_MIN_TREES)
+        })
+    return schedule
+
+
+def _evaluate_candidate(params, X_fit, y_fit, X_val, y_val, n_trees, random_state):
+    """Fit one candidate on a single core and score it on the validation rows"""
+    start = time.perf_counter()
+    model = create_forest(n_trees, random_state=random_state, n_jobs=1, **params)
+    model.fit(X_fit, y_fit)
+    mae = mean_absolute_error(y_val, model.predict(X_val))
+    return mae, time.perf_counter() - start
+
+
+def search_hyperparameters(X, y, preprocessor, train_size=0.8, random_state=42,
+                           n_estimators=500, time_budget=SEARCH_DEFAULT_BUDGET_SECONDS,
+                           n_candidates=SEARCH_N_CANDIDATES, factor=SEARCH_HALVING_FACTOR,
+                           progress_callback=None):
+    """
+    Search max_depth, min_samples_split and min_samples_leaf by
+    successive halving, then train the best candidate
+    
+    The test split of train_model is left untouched: candidates are
+    fitted on part of the training split and ranked by MAE on the rest.
+    The preprocessor is fitted once and every candidate reads the same
+    encoded arrays; candidates of a rung run on one thread per core
+    (tree fitting releases the GIL), so nothing is copied per worker.
+    
+    time_budget covers the search and the final fit. Fit times measured
+    in the latest batch predict the cost of the next batch of candidates and of the
+    final model; the search stops when both no longer fit, and the
+    final model gets fewer trees when even it alone would not.
+    
+    Args:
+        X: features DataFrame
+        y: target Series
+        preprocessor: unfitted preprocessing pipeline
+        train_size: proportion of training data (as in train_model)
+        random_state: random state for the split, candidates and forests
+        n_estimators: trees of the final model
+        time_budget: seconds for search plus final fit
+        n_candidates: candidates in the first rung
+        factor: halving factor
+        progress_callback: optional callable(n_done, n_total) over
+            candidate evaluations plus the final fit; returning False
+            stops the search
+            
+    Returns:
+        dict: train_model result of the best candidate plus
+        'leaderboard' (one row per evaluation, best first),
+        'best_params', 'search_seconds' and 'stopped_early'
+        
+    Raises:
+        TrainingCancelled: when progress_callback returns False
+    """
+    start = time.perf_counter()
+    progress_callback = progress_callback or (lambda n_done, n_total: True)
+    
+    # Same split as train_model, then a validation part of the training rows
+    X_train, _, y_train, _ = train_test_split(
+        X, y, train_size=train_size, random_state=random_state
+    )
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=SEARCH_VALIDATION_SIZE, random_state=random_state
+    )
+    encoder = clone(preprocessor)
+    Xt_fit = encoder.fit_transform(X_fit, y_fit)
+    Xt_val = encoder.transform(X_val)
+    if sparse.issparse(Xt_fit):
+        Xt_fit = Xt_fit.tocsr()
+    y_fit = np.asarray(y_fit)
+    
+    candidates = sample_candidates(n_candidates, random_state)
+    schedule = halving_schedule(
+        len(candidates), len(y_fit), min(n_estimators, SEARCH_MAX_TREES), factor
+    )
+    n_total = sum(step['n_candidates'] for step in schedule) + 1
+    n_workers = effective_n_jobs(-1)
+    # Nested row subsets: every rung extends the rows of the previous one
+    order = np.random.default_rng(random_state).permutation(len(y_fit))
+    
+    records = []
+    survivors = list(range(len(candidates)))
+    scores = {}
+    n_done = 0
+    # Seconds per tree per row on one core, from the latest batch (the
+    # largest fits so far, so the closest to the final one)
+    unit_seconds = None
+    stopped_early = False
+    
+    def final_cost(n_trees):
+        # Seconds for the final fit on all training rows and cores
+        return unit_seconds * n_trees * len(y_train) / n_workers
+    
+    for rung, step in enumerate(schedule):
+        # Survivors are sorted by the previous rung's score
+        survivors = survivors[:step['n_candidates']]
+        rows = np.sort(order[:step['n_rows']])
+        X_rung = Xt_fit[rows]
+        if sparse.issparse(X_rung):
+            X_rung = X_rung.tocsc()
+        y_rung = y_fit[rows]
+        scores = {}
+        
+        for first in range(0, len(survivors), n_workers):
+            if not progress_callback(n_done, n_total):
+                raise TrainingCancelled()
+            if unit_seconds is not None:
+                batch_cost = unit_seconds * step['n_trees'] * step['n_rows']
+                elapsed = time.perf_counter() - start
+                if elapsed + batch_cost + final_cost(n_estimators) > time_budget:
+                    stopped_early = True
+                    break
+            
+            batch = survivors[first:first + n_workers]
+            results = Parallel(n_jobs=n_workers, prefer='threads')(
+                delayed(_evaluate_candidate)(
+                    candidates[i], X_rung, y_rung, Xt_val, y_val, step['n_trees'], random_state
+                )
+                for i in batch
+            )
+            unit_seconds = (
+                sum(seconds for _, seconds in results)
+                / (len(batch) * step['n_trees'] * step['n_rows'])
+            )
+            for i, (mae, seconds) in zip(batch, results):
+                scores[i] = mae
+                records.append({
+                    'candidate': i,
+                    'rung': rung,
+                    'n_rows': step['n_rows'],
+                    'n_trees': step['n_trees'],
+                    **candidates[i],
+                    'val_mae': mae,
+                    'seconds': seconds
+                })
+            n_done += len(batch)
+        
+        if scores:
+            survivors = sorted(scores, key=scores.get)
+        if stopped_early:
+            break
+    
+    # Best candidate of the highest rung that has scores
+    best = survivors[0]
+    best_params = dict(candidates[best])
+    
+    # Fewer final trees when the full forest would overrun the budget
+    remaining = time_budget - (time.perf_counter() - start)
+    n_final = n_estimators
+    if final_cost(n_estimators) > remaining:
+        n_final = int(remaining / final_cost(1)) if remaining > 0 else 0
+        n_final = min(max(n_final, SEARCH_MIN_TREES), n_estimators)
+    
+    result = train_model(
+        X, y, clone(preprocessor), train_size, random_state, n_final,
+        progress_callback=lambda n_trees, n_trees_total: progress_callback(n_done, n_total),
+        **best_params
+    )
+    progress_callback(n_total, n_total)
+    
+    leaderboard = pd.DataFrame(records)
+    leaderboard = leaderboard.sort_values(['rung', 'val_mae'], ascending=[False, True])
+    result['leaderboard'] = leaderboard.reset_index(drop=True)
+    result['best_params'] = dict(best_params, n_estimators=n_final)
+    result['search_seconds'] = time.perf_counter() - start
+    result['stopped_early'] = stopped_early
+    return result
@@ -1,20 +1,291 @@
 """
 Model training and evaluation for ForestCal application
 """
+import pickle
+import threading
+import time
+
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
+from joblib import Parallel, delayed, effective_n_jobs
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.model_selection import KFold, train_test_split
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+from sklearn.inspection import permutation_importance
 from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OrdinalEncoder
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from config.settings import (
+    HGB_LEARNING_RATE,
+    HGB_MAX_LEAF_NODES,
+    HGB_MAX_BINS,
+    HGB_VALIDATION_FRACTION,
+    HGB_N_ITER_NO_CHANGE,
+    HGB_PROGRESS_ITERATIONS,
+    PERMUTATION_IMPORTANCE_MAX_ROWS,
+    OOB_STOP_BATCH_TREES,
+    OOB_STOP_MIN_TREES,
+    OOB_STOP_TOLERANCE,
+    OOB_STOP_PATIENCE,
+    PREVIEW_ROWS,
+    PREVIEW_N_ESTIMATORS,
+    PREVIEW_MAX_DEPTH,
+    PREVIEW_STRATA
+)
+
+
+class TrainingCancelled(Exception):
+    """Raised when a progress callback asks to stop training"""
+
+
+def _grow_trees(model, Xt, y_train, n_total, progress_callback, batch_size=None):
+    """
+    Add trees to a forest with warm_start, a batch at a time, until it
+    holds n_total trees
+    
+    Raises:
+        TrainingCancelled: when progress_callback returns False
+    """
+    batch_size = batch_size or effective_n_jobs(model.n_jobs)
+    if sparse.issparse(Xt):
+        # The forest fits on CSC; convert once instead of per batch
+        Xt = Xt.tocsc()
+    
+    # OOB predictions are recomputed over all trees on every fit, so
+    # only the last batch computes them
+    oob_score = model.oob_score
+    model.set_params(warm_start=True)
+    n_done = len(getattr(model, 'estimators_', []))
+    while n_done < n_total:
+        n_done = min(n_done + batch_size, n_total)
+        model.set_params(n_estimators=n_done, oob_score=oob_score and n_done == n_total)
+        model.fit(Xt, y_train)
+        if not progress_callback(n_done, n_total):
+            raise TrainingCancelled()
+    model.set_params(warm_start=False, oob_score=oob_score)
+
+
+def _grow_boosting(model, Xt, y_train, n_total, progress_callback, batch_size=None):
+    """
+    Add boosting iterations with warm_start, a batch at a time, until
+    the model holds n_total iterations or early stopping ends it
+    
+    Raises:
+        TrainingCancelled: when progress_callback returns False
+    """
+    batch_size = batch_size or HGB_PROGRESS_ITERATIONS
+    model.set_params(warm_start=True)
+    n_done = getattr(model, 'n_iter_', 0)
+    while n_done < n_total:
+        n_target = min(n_done + batch_size, n_total)
+        model.set_params(max_iter=n_target)
+        model.fit(Xt, y_train)
+        n_done = model.n_iter_
+        stopped = n_done < n_target
+        if not progress_callback(n_total if stopped else n_done, n_total):
+            raise TrainingCancelled()
+        if stopped:
+            break
+    model.set_params(warm_start=False, max_iter=n_total)
+
+
+def _fitted_encoders(preprocessor):
+    """
+    Find the fitted ColumnTransformer and its 'cat' encoder
+    
+    Args:
+        preprocessor: fitted preprocessing step(s)
+        
+    Returns:
+        tuple: (ColumnTransformer or None, categorical encoder or None)
+    """
+    encoder = preprocessor
+    while isinstance(encoder, Pipeline):
+        encoder = encoder.steps[-1][1]
+    if not isinstance(encoder, ColumnTransformer):
+        return None, None
+    return encoder, encoder.named_transformers_.get('cat')
+
+
+def _set_native_categories(model, preprocessor):
+    """
+    Let a boosting model split ordinal-encoded columns as categories
+    
+    Columns with more than HGB_MAX_BINS categories stay numeric codes,
+    which is the most the model can bin.
+    
+    Args:
+        model: HistGradientBoostingRegressor
+        preprocessor: fitted preprocessing step(s) producing its input
+    """
+    encoder, cat = _fitted_encoders(preprocessor)
+    if not isinstance(cat, OrdinalEncoder):
+        model.set_params(categorical_features=None)
+        return
+    
+    native = {
+        f"cat__{name}"
+        for name, categories in zip(cat.feature_names_in_, cat.categories_)
+        if len(categories) <= HGB_MAX_BINS
+    }
+    mask = np.array([name in native for name in encoder.get_feature_names_out()])
+    model.set_params(categorical_features=mask if mask.any() else None)
+
+
+def create_forest(n_estimators=500, max_depth=20, min_samples_split=5, min_samples_leaf=2,
+                  random_state=42, n_jobs=-1, oob_score=False, max_samples=None):
+    """
+    Create the Random Forest regressor used by the application
+    
+    Args:
+        oob_score: whether fitting also computes out-of-bag predictions
+            (oob_prediction_)
+        max_samples: fraction of the training rows drawn for each
+            tree's bootstrap sample (None = all)
+            
+    Returns:
+        unfitted RandomForestRegressor
+    """
+    return RandomForestRegressor(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        min_samples_split=min_samples_split,
+        min_samples_leaf=min_samples_leaf,
+        max_features='sqrt',
+        bootstrap=True,
+        oob_score=oob_score,
+        max_samples=max_samples,
+        n_jobs=n_jobs,
+        random_state=random_state
+    )
+
+
+def create_boosting(max_iter=500, max_depth=20, min_samples_leaf=2,
+                    learning_rate=HGB_LEARNING_RATE, random_state=42):
+    """
+    Create the histogram gradient boosting regressor used by the
+    application
+    
+    Features are binned into at most HGB_MAX_BINS values, and training
+    stops early once the loss on a HGB_VALIDATION_FRACTION part of the
+    training rows has not improved for HGB_N_ITER_NO_CHANGE iterations.
+    
+    Returns:
+        unfitted HistGradientBoostingRegressor
+    """
+    return HistGradientBoostingRegressor(
+        learning_rate=learning_rate,
+        max_iter=max_iter,
+        max_leaf_nodes=HGB_MAX_LEAF_NODES,
+        max_depth=max_depth,
+        min_samples_leaf=min_samples_leaf,
+        max_bins=HGB_MAX_BINS,
+        early_stopping=True,
+        validation_fraction=HGB_VALIDATION_FRACTION,
+        n_iter_no_change=HGB_N_ITER_NO_CHANGE,
+        random_state=random_state
+    )
+
+
+def create_model(engine='random forest', n_estimators=500, max_depth=20, min_samples_split=5,
+                 min_samples_leaf=2, random_state=42, n_jobs=-1, learning_rate=HGB_LEARNING_RATE,
+                 max_samples=None):
+    """
+    Create the regressor of one of MODEL_ENGINES
+    
+    For 'hist gradient boosting' n_estimators is the maximum number of
+    iterations; min_samples_split, n_jobs and max_samples only apply to
+    the forest (boosting uses every core through OpenMP), learning_rate
+    only to boosting.
+    
+    Returns:
+        unfitted regressor
+    """
+    if engine == 'hist gradient boosting':
+        return create_boosting(n_estimators, max_depth, min_samples_leaf, learning_rate, random_state)
+    return create_forest(
+        n_estimators, max_depth, min_samples_split, min_samples_leaf, random_state, n_jobs,
+        max_samples=max_samples
+    )
+
+
+def fit_model_incrementally(pipeline, X_train, y_train, progress_callback, batch_size=None):
+    """
+    Fit a preprocessor + forest or boosting pipeline a batch at a time
+    
+    The preprocessor is fitted once; the model then grows with
+    warm_start. A forest draws the same per-tree seeds as a single fit,
+    so the result is identical to pipeline.fit; a boosting model keeps
+    its bins and early-stopping split between batches.
+    
+    Args:
+        pipeline: unfitted Pipeline with a 'model' forest or boosting
+            model as last step
+        X_train: training features
+        y_train: training target
+        progress_callback: callable(n_done, n_total) called before the
+            first and after every batch; returning False stops training
+        batch_size: trees per batch (None = one per CPU used) or
+            boosting iterations per batch (None = HGB_PROGRESS_ITERATIONS)
+        
+    Raises:
+        TrainingCancelled: when progress_callback returns False
+    """
+    model = pipeline.named_steps['model']
+    boosting = isinstance(model, HistGradientBoostingRegressor)
+    n_total = model.max_iter if boosting else model.n_estimators
+    if not progress_callback(0, n_total):
+        raise TrainingCancelled()
+    
+    Xt = pipeline[:-1].fit_transform(X_train, y_train)
+    if boosting:
+        _set_native_categories(model, pipeline[:-1])
+        _grow_boosting(model, Xt, y_train, n_total, progress_callback, batch_size)
+    else:
+        _grow_trees(model, Xt, y_train, n_total, progress_callback, batch_size)
+    return pipeline
+
+
+def _fit_pipeline(pipeline, X_train, y_train, progress_callback=None):
+    """
+    Fit a pipeline in one go, or a batch at a time when progress is
+    reported
+    """
+    model = pipeline.named_steps['model']
+    if isinstance(model, HistGradientBoostingRegressor):
+        # Native categories are read from the fitted preprocessor
+        batch_size = None if progress_callback else model.max_iter
+        return fit_model_incrementally(
+            pipeline, X_train, y_train,
+            progress_callback or (lambda n_done, n_total: True), batch_size
+        )
+    if progress_callback is None:
+        return pipeline.fit(X_train, y_train)
+    return fit_model_incrementally(pipeline, X_train, y_train, progress_callback)
+
+
+def model_size_bytes(pipeline):
+    """
+    Size of the pickled model step of a trained pipeline
+    
+    Args:
+        pipeline: trained sklearn Pipeline
+        
+    Returns:
+        int: bytes
+    """
+    return len(pickle.dumps(pipeline.named_steps['model'], protocol=pickle.HIGHEST_PROTOCOL))
 
 
 def train_model(X, y, preprocessor, train_size=0.8, random_state=42, 
                 n_estimators=500, max_depth=20, min_samples_split=5, 
-                min_samples_leaf=2):
+                min_samples_leaf=2, progress_callback=None, engine='random forest',
+                learning_rate=HGB_LEARNING_RATE, max_samples=None):
     """
-    Train Random Forest model
+    Train Random Forest (or gradient boosting) model
     
     Args:
         X: features DataFrame
@@ -26,6 +297,12 @@ def train_model(X, y, preprocessor, train_size=0.8, random_state=42,
         max_depth: maximum depth of trees (None for unlimited)
         min_samples_split: minimum samples required to split
         min_samples_leaf: minimum samples required at leaf node
+        progress_callback: optional callable(n_done, n_total) reporting
+            trees or iterations fitted so far (see fit_model_incrementally)
+        engine: one of MODEL_ENGINES (see create_model)
+        learning_rate: boosting learning rate
+        max_samples: bootstrap fraction of the training rows per tree
+            (forest only, None = all)
         
     Returns:
         dict: {
@@ -35,20 +312,14 @@ def train_model(X, y, preprocessor, train_size=0.8, random_state=42,
             'y_train': training target,
             'y_test': test target,
             'y_pred': predictions on test set,
-            'y_pred_baseline': baseline predictions
+            'y_pred_baseline': baseline predictions,
+            'fit_seconds': seconds spent fitting the pipeline
         }
     """
-    # Build Random Forest Regressor
-    model = RandomForestRegressor(
-        n_estimators=n_estimators,
-        max_depth=max_depth,
-        min_samples_split=min_samples_split,
-        min_samples_leaf=min_samples_leaf,
-        max_features='sqrt',
-        bootstrap=True,
-        oob_score=False,
-        n_jobs=-1,
-        random_state=random_state
+    # Build Random Forest (or boosting) Regressor
+    model = create_model(
+        engine, n_estimators, max_depth, min_samples_split, min_samples_leaf, random_state,
+        learning_rate=learning_rate, max_samples=max_samples
     )
     
     # Create pipeline
@@ -63,7 +334,9 @@ def train_model(X, y, preprocessor, train_size=0.8, random_state=42,
     )
     
     # Train model
-    pipeline.fit(X_train, y_train)
+    start = time.perf_counter()
+    _fit_pipeline(pipeline, X_train, y_train, progress_callback)
+    fit_seconds = time.perf_counter() - start
     
     # Predict
     y_pred = pipeline.predict(X_test)
@@ -78,10 +351,476 @@ def train_model(X, y, preprocessor, train_size=0.8, random_state=42,
         'y_train': y_train,
         'y_test': y_test,
         'y_pred': y_pred,
-        'y_pred_baseline': y_pred_baseline
+        'y_pred_baseline': y_pred_baseline,
+        'fit_seconds': fit_seconds
+    }
+
+
+def train_model_oob(X, y, preprocessor, random_state=42, n_estimators=500, max_depth=20,
+                    min_samples_split=5, min_samples_leaf=2, progress_callback=None):
+    """
+    Train Random Forest model on all rows and evaluate it out-of-bag
+    
+    Every tree is fitted on a bootstrap sample, so each row is predicted
+    by the trees that did not see it. These out-of-bag predictions take
+    the place of the test set predictions: the evaluation and test keys
+    of the result hold all rows, and no row is held out from training.
+    
+    Args:
+        X, y, preprocessor, random_state, n_estimators, max_depth,
+        min_samples_split, min_samples_leaf, progress_callback: see
+            train_model
+            
+    Returns:
+        dict: same keys as train_model, where X_test/y_test are all rows,
+        y_pred the out-of-bag predictions and y_pred_baseline the mean
+        of y, plus 'evaluation': 'out-of-bag'
+    """
+    model = create_forest(
+        n_estimators, max_depth, min_samples_split, min_samples_leaf, random_state,
+        oob_score=True
+    )
+    pipeline = Pipeline(steps=[
+        ('preprocessor', preprocessor),
+        ('model', model)
+    ])
+    
+    start = time.perf_counter()
+    _fit_pipeline(pipeline, X, y, progress_callback)
+    fit_seconds = time.perf_counter() - start
+    
+    return {
+        'pipeline': pipeline,
+        'X_train': X,
+        'X_test': X,
+        'y_train': y,
+        'y_test': y,
+        'y_pred': model.oob_prediction_,
+        'y_pred_baseline': np.full_like(y, y.mean(), dtype=float),
+        'fit_seconds': fit_seconds,
+        'evaluation': 'out-of-bag'
+    }
+
+
+def train_preview(X, y, preprocessor, train_size=0.8, random_state=42):
+    """
+    Train a small, shallow forest on a subsample for a first look
+    
+    The split is the one train_model uses, so the preview is scored on
+    the same test rows as the full model. PREVIEW_ROWS training rows
+    are drawn stratified by PREVIEW_STRATA target quantiles, which keeps
+    the whole target range in the sample.
+    
+    Args:
+        X: features DataFrame
+        y: target Series
+        preprocessor: unfitted preprocessing pipeline (not modified)
+        train_size: proportion of training data
+        random_state: random state for the split, sample and forest
+        
+    Returns:
+        dict: same keys as train_model plus 'preview' with 'n_rows',
+        'n_estimators' and 'max_depth'
+    """
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, train_size=train_size, random_state=random_state
+    )
+    X_fit, y_fit = X_train, y_train
+    if len(y_train) > PREVIEW_ROWS:
+        strata = pd.qcut(y_train, PREVIEW_STRATA, labels=False, duplicates='drop')
+        X_fit, _, y_fit, _ = train_test_split(
+            X_train, y_train, train_size=PREVIEW_ROWS, stratify=strata,
+            random_state=random_state
+        )
+    
+    pipeline = Pipeline(steps=[
+        ('preprocessor', clone(preprocessor)),
+        ('model', create_forest(
+            PREVIEW_N_ESTIMATORS, PREVIEW_MAX_DEPTH, random_state=random_state
+        ))
+    ])
+    start = time.perf_counter()
+    pipeline.fit(X_fit, y_fit)
+    fit_seconds = time.perf_counter() - start
+    
+    return {
+        'pipeline': pipeline,
+        'X_train': X_train,
+        'X_test': X_test,
+        'y_train': y_train,
+        'y_test': y_test,
+        'y_pred': pipeline.predict(X_test),
+        'y_pred_baseline': np.full_like(y_test, y_train.mean(), dtype=float),
+        'fit_seconds': fit_seconds,
+        'preview': {
+            'n_rows': len(y_fit),
+            'n_estimators': PREVIEW_N_ESTIMATORS,
+            'max_depth': PREVIEW_MAX_DEPTH
+        }
+    }
+
+
+def _in_bag_samples(model, first):
+    """Bootstrap row indices of the trees from position first on"""
+    trees = model.estimators_
+    model.estimators_ = trees[first:]
+    try:
+        return model.estimators_samples_
+    finally:
+        model.estimators_ = trees
+
+
+def train_until_converged(X, y, preprocessor, train_size=0.8, random_state=42,
+                          n_estimators=1000, max_depth=20, min_samples_split=5,
+                          min_samples_leaf=2, progress_callback=None):
+    """
+    Train Random Forest model, adding trees until the out-of-bag error
+    stops improving
+    
+    Trees are added OOB_STOP_BATCH_TREES at a time. After each batch
+    only the new trees predict their out-of-bag training rows, which
+    updates the running OOB predictions without rescoring the forest.
+    Growing stops once the best OOB MAE so far improved by less than
+    OOB_STOP_TOLERANCE (relative) per batch over the last
+    OOB_STOP_PATIENCE batches, all grown after OOB_STOP_MIN_TREES
+    trees. Comparing running bests over a window, instead of each batch
+    with the one before, keeps a small noisy dip from restarting the
+    wait. Tree i gets the same seed as in train_model, so the model
+    equals train_model with the final tree count.
+    
+    Args:
+        X, y, preprocessor, train_size, random_state, max_depth,
+        min_samples_split, min_samples_leaf: see train_model
+        n_estimators: most trees to grow
+        progress_callback: optional callable(n_done, n_total) over
+            trees, n_total being n_estimators
+            
+    Returns:
+        dict: train_model result plus 'oob_curve' (DataFrame of
+        'n_trees' and 'oob_mae' after every batch) and 'converged'
+        (False when n_estimators was reached first)
+        
+    Raises:
+        TrainingCancelled: when progress_callback returns False
+    """
+    progress_callback = progress_callback or (lambda n_done, n_total: True)
+    model = create_forest(n_estimators, max_depth, min_samples_split, min_samples_leaf, random_state)
+    pipeline = Pipeline(steps=[
+        ('preprocessor', preprocessor),
+        ('model', model)
+    ])
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, train_size=train_size, random_state=random_state
+    )
+    
+    start = time.perf_counter()
+    if not progress_callback(0, n_estimators):
+        raise TrainingCancelled()
+    Xt = pipeline[:-1].fit_transform(X_train, y_train)
+    if sparse.issparse(Xt):
+        # Trees predict on CSR
+        Xt = Xt.tocsr()
+    y_values = np.asarray(y_train, dtype=float)
+    oob_sum = np.zeros(len(y_values))
+    oob_count = np.zeros(len(y_values))
+    curve = []
+    best_mae = []
+    converged = False
+    
+    n_trees = 0
+    while n_trees < n_estimators:
+        n_target = min(n_trees + OOB_STOP_BATCH_TREES, n_estimators)
+        _grow_trees(model, Xt, y_train, n_target, lambda n_done, n_total: progress_callback(n_done, n_estimators))
+        for tree, in_bag in zip(model.estimators_[n_trees:], _in_bag_samples(model, n_trees)):
+            oob = np.ones(len(y_values), dtype=bool)
+            oob[in_bag] = False
+            oob_sum[oob] += tree.predict(Xt[oob])
+            oob_count[oob] += 1
+        n_trees = n_target
+        
+        seen = oob_count > 0
+        oob_mae = float(np.mean(np.abs(y_values[seen] - oob_sum[seen] / oob_count[seen])))
+        curve.append({'n_trees': n_trees, 'oob_mae': oob_mae})
+        best_mae.append(min(best_mae[-1], oob_mae) if best_mae else oob_mae)
+        
+        if len(curve) > OOB_STOP_PATIENCE and curve[-OOB_STOP_PATIENCE - 1]['n_trees'] >= OOB_STOP_MIN_TREES:
+            before = best_mae[-OOB_STOP_PATIENCE - 1]
+            if before - best_mae[-1] < OOB_STOP_TOLERANCE * OOB_STOP_PATIENCE * before:
+                converged = True
+                break
+    model.set_params(n_estimators=n_trees)
+    fit_seconds = time.perf_counter() - start
+    progress_callback(n_estimators, n_estimators)
+    
+    return {
+        'pipeline': pipeline,
+        'X_train': X_train,
+        'X_test': X_test,
+        'y_train': y_train,
+        'y_test': y_test,
+        'y_pred': pipeline.predict(X_test),
+        'y_pred_baseline': np.full_like(y_test, y_train.mean(), dtype=float),
+        'fit_seconds': fit_seconds,
+        'oob_curve': pd.DataFrame(curve),
+        'converged': converged
+    }
+
+
+def grow_forest(train_result, n_estimators, progress_callback=None):
+    """
+    Change the number of trees of a trained model without refitting it
+    
+    Extra trees are fitted with warm_start on the stored training split;
+    a lower n_estimators truncates the tree list. Tree i always gets the
+    same seed, so the result equals train_model with the new
+    n_estimators and otherwise unchanged arguments.
+    
+    Args:
+        train_result: dict returned by train_model; its pipeline is
+            updated in place
+        n_estimators: new number of trees
+        progress_callback: optional callable(n_done, n_total) (see
+            fit_model_incrementally)
+            
+    Returns:
+        dict: same keys as train_model
+        
+    Raises:
+        TrainingCancelled: when progress_callback returns False
+    """
+    pipeline = train_result['pipeline']
+    X_train = train_result['X_train']
+    X_test = train_result['X_test']
+    y_train = train_result['y_train']
+    y_test = train_result['y_test']
+    model = pipeline.named_steps['model']
+    n_current = len(model.estimators_)
+    progress_callback = progress_callback or (lambda n_done, n_total: True)
+    if not progress_callback(min(n_current, n_estimators), n_estimators):
+        raise TrainingCancelled()
+    
+    if n_estimators < n_current:
+        model.estimators_ = model.estimators_[:n_estimators]
+        model.set_params(n_estimators=n_estimators)
+    elif n_estimators > n_current:
+        Xt = pipeline[:-1].transform(X_train)
+        _grow_trees(model, Xt, y_train, n_estimators, progress_callback)
+    
+    return {
+        'pipeline': pipeline,
+        'X_train': X_train,
+        'X_test': X_test,
+        'y_train': y_train,
+        'y_test': y_test,
+        'y_pred': pipeline.predict(X_test),
+        'y_pred_baseline': np.full_like(y_test, y_train.mean(), dtype=float)
     }
 
 
+def split_cores(n_tasks, n_jobs=-1):
+    """
+    Share the cores between tasks that each fit a forest
+    
+    Args:
+        n_tasks: number of independent tasks
+        n_jobs: cores to use (joblib convention, -1 = all)
+        
+    Returns:
+        tuple: (tasks run at the same time, forest n_jobs per task);
+        their product never exceeds the cores
+    """
+    n_cores = effective_n_jobs(n_jobs)
+    n_workers = max(min(n_tasks, n_cores), 1)
+    return n_workers, max(n_cores // n_workers, 1)
+
+
+def cross_validate_model(X, y, preprocessor, n_splits=5, random_state=42,
+                         n_estimators=500, max_depth=20, min_samples_split=5,
+                         min_samples_leaf=2, progress_callback=None, engine='random forest',
+                         learning_rate=HGB_LEARNING_RATE):
+    """
+    K-fold cross-validation of the preprocessing + model pipeline
+    
+    Every fold fits its own clone of the preprocessor on its training
+    rows. Folds run on threads that read the same X and y, with the
+    cores split between folds and each forest's n_jobs (split_cores).
+    Boosting already uses every core, so its folds run one at a time.
+    
+    Args:
+        X: features DataFrame
+        y: target Series
+        preprocessor: unfitted preprocessing pipeline
+        n_splits: number of folds
+        random_state: random state for the fold shuffle and the forests
+        n_estimators, max_depth, min_samples_split, min_samples_leaf:
+            model hyperparameters (see train_model)
+        progress_callback: optional callable(n_done, n_total) over
+            folds; returning False stops before the next fold
+        engine: one of MODEL_ENGINES (see create_model)
+        learning_rate: boosting learning rate
+            
+    Returns:
+        pandas DataFrame: evaluate_model metrics per fold (index 'fold')
+        
+    Raises:
+        TrainingCancelled: when progress_callback returns False
+    """
+    progress_callback = progress_callback or (lambda n_done, n_total: True)
+    folds = KFold(n_splits=n_splits, shuffle=True, random_state=random_state).split(X)
+    n_workers, n_jobs = split_cores(1 if engine == 'hist gradient boosting' else n_splits)
+    lock = threading.Lock()
+    n_done = [0]
+    
+    def fit_fold(train_idx, test_idx):
+        if not progress_callback(n_done[0], n_splits):
+            raise TrainingCancelled()
+        X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
+        y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
+        pipeline = Pipeline(steps=[
+            ('preprocessor', clone(preprocessor)),
+            ('model', create_model(
+                engine, n_estimators, max_depth, min_samples_split, min_samples_leaf,
+                random_state, n_jobs, learning_rate
+            ))
+        ])
+        _fit_pipeline(pipeline, X_train, y_train)
+        metrics = evaluate_model(
+            y_test, pipeline.predict(X_test),
+            np.full_like(y_test, y_train.mean(), dtype=float)
+        )
+        with lock:
+            n_done[0] += 1
+            done = n_done[0]
+        if not progress_callback(done, n_splits):
+            raise TrainingCancelled()
+        return metrics
+    
+    results = Parallel(n_jobs=n_workers, prefer='threads')(
+        delayed(fit_fold)(train_idx, test_idx) for train_idx, test_idx in folds
+    )
+    return pd.DataFrame(results, index=pd.RangeIndex(1, n_splits + 1, name='fold'))
+
+
+def summarize_cross_validation(fold_metrics):
+    """
+    Mean and spread of the cross-validation metrics
+    
+    Args:
+        fold_metrics: DataFrame returned by cross_validate_model
+        
+    Returns:
+        pandas DataFrame indexed by 'mae', 'rmse', 'r2' and 'mape' with
+        'mean' and 'std' (standard deviation over the folds)
+    """
+    return fold_metrics[['mae', 'rmse', 'r2', 'mape']].agg(['mean', 'std']).T
+
+
+def train_with_cross_validation(X, y, preprocessor, train_size=0.8, random_state=42,
+                                n_estimators=500, max_depth=20, min_samples_split=5,
+                                min_samples_leaf=2, n_splits=5, progress_callback=None,
+                                engine='random forest', learning_rate=HGB_LEARNING_RATE):
+    """
+    Train the hold-out model and cross-validate the same configuration
+    
+    Args:
+        X, y, preprocessor, train_size, random_state, n_estimators,
+        max_depth, min_samples_split, min_samples_leaf, engine,
+        learning_rate: see train_model
+        n_splits: number of cross-validation folds
+        progress_callback: optional callable(n_done, n_total) over the
+            hold-out model plus the folds
+            
+    Returns:
+        dict: train_model result plus 'cv_folds' (see
+        cross_validate_model)
+    """
+    progress_callback = progress_callback or (lambda n_done, n_total: True)
+    n_total = n_splits + 1
+    params = dict(
+        random_state=random_state, n_estimators=n_estimators, max_depth=max_depth,
+        min_samples_split=min_samples_split, min_samples_leaf=min_samples_leaf,
+        engine=engine, learning_rate=learning_rate
+    )
+    result = train_model(
+        X, y, clone(preprocessor), train_size,
+        progress_callback=lambda n_trees, n_trees_total: progress_callback(0, n_total),
+        **params
+    )
+    result['cv_folds'] = cross_validate_model(
+        X, y, preprocessor, n_splits,
+        progress_callback=lambda n_folds, n_folds_total: progress_callback(n_folds + 1, n_total),
+        **params
+    )
+    return result
+
+
+def describe_model_inputs(pipeline, X_train, numeric_features, categorical_features):
+    """
+    Describe the inputs a trained model accepts, for entry forms
+    
+    Numeric ranges come from one quantile call over the training
+    features the model was fitted on. Categories are every category of
+    the fitted encoder (categories_ is never capped, also with
+    'top-k + other'); features without one fall back to the distinct
+    training values.
+    
+    Args:
+        pipeline: trained pipeline
+        X_train: training features
+        numeric_features: list of numeric feature names
+        categorical_features: list of categorical feature names
+        
+    Returns:
+        pandas DataFrame indexed by feature with 'min', 'median', 'max'
+        (numeric features) and 'categories' (list, categorical features)
+    """
+    inputs = pd.DataFrame(
+        index=list(numeric_features) + list(categorical_features),
+        columns=['min', 'median', 'max', 'categories'],
+        dtype=object
+    )
+    if numeric_features:
+        stats = X_train[numeric_features].quantile([0.0, 0.5, 1.0]).T
+        inputs.loc[numeric_features, ['min', 'median', 'max']] = stats.to_numpy()
+    
+    _, cat = _fitted_encoders(pipeline.named_steps['preprocessor'])
+    encoded = {}
+    if cat is not None and hasattr(cat, 'categories_'):
+        encoded = {
+            name: [value for value in categories if not pd.isna(value)]
+            for name, categories in zip(cat.feature_names_in_, cat.categories_)
+        }
+    for c in categorical_features:
+        if c not in encoded:
+            encoded[c] = sorted(X_train[c].dropna().unique().tolist(), key=str)
+        inputs.at[c, 'categories'] = list(encoded[c])
+    return inputs
+
+
+def predict_batch(pipeline, df, feature_cols):
+    """
+    Score new rows with a trained pipeline in a single predict call
+    
+    Missing feature values are filled by the pipeline's fitted
+    MissingValueImputer, so no manual preprocessing is needed.
+    
+    Args:
+        pipeline: trained sklearn Pipeline
+        df: DataFrame holding at least the feature columns
+        feature_cols: feature columns used in training
+        
+    Returns:
+        pandas DataFrame: df with an added 'predicted' column
+        
+    Raises:
+        ValueError: when feature columns are missing from df
+    """
+    missing = [c for c in feature_cols if c not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom fitur tidak ditemukan: {', '.join(missing)}")
+    return df.assign(predicted=pipeline.predict(df[feature_cols]))
+
+
 def evaluate_model(y_test, y_pred, y_pred_baseline):
     """
     Evaluate model performance
@@ -125,20 +864,34 @@ def evaluate_model(y_test, y_pred, y_pred_baseline):
     }
 
 
-def get_feature_importance(pipeline):
+def get_feature_importance(pipeline, X=None, y=None):
     """
     Extract feature importances from trained pipeline
     
+    Forests report impurity importances. Boosting models have none, so
+    their importances are permutation importances (mean drop of R²
+    when a column is shuffled) on up to PERMUTATION_IMPORTANCE_MAX_ROWS
+    rows of X/y.
+    
     Args:
         pipeline: trained sklearn Pipeline
+        X: evaluation features, needed for boosting models
+        y: evaluation target, needed for boosting models
         
     Returns:
         pandas DataFrame with features and importances
     """
     try:
-        # Get Random Forest model
-        rf_model = pipeline.named_steps['model']
-        importances = rf_model.feature_importances_
+        model = pipeline.named_steps['model']
+        if hasattr(model, 'feature_importances_'):
+            importances = model.feature_importances_
+        else:
+            importances = permutation_importance(
+                model, pipeline[:-1].transform(X), y,
+                n_repeats=5,
+                random_state=0,
+                max_samples=min(len(y), PERMUTATION_IMPORTANCE_MAX_ROWS)
+            ).importances_mean
         
         # Get feature names after preprocessing
         if hasattr(pipeline.named_steps['preprocessor'], 'get_feature_names_out'):
@@ -0,0 +1,377 @@
+"""
+Background training jobs for ForestCal application
+"""
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from joblib import cpu_count
+from threadpoolctl import threadpool_limits
+from config.settings import (
+    TRAINING_CPU_CORES,
+    TRAINING_MAX_CONCURRENT_JOBS,
+    TRAINING_JOB_TTL_SECONDS,
+    MP_START_METHOD,
+)
+from ml_models.training import (
+    train_model,
+    train_model_oob,
+    train_until_converged,
+    grow_forest,
+    train_with_cross_validation,
+    TrainingCancelled
+)
+from ml_models.search import search_hyperparameters
+from ml_models.budget import train_within_budget
+
+
+def allocate_cores(n_cores=TRAINING_CPU_CORES, max_jobs=TRAINING_MAX_CONCURRENT_JOBS):
+    """
+    Split the training cores between concurrent jobs
+    
+    Args:
+        n_cores: cores shared by all jobs (None = every usable core)
+        max_jobs: jobs wanted at the same time
+        
+    Returns:
+        tuple: (jobs run at the same time, at most one per core; cores
+        per job)
+    """
+    n_cores = min(n_cores or cpu_count(), cpu_count())
+    n_concurrent = max(min(max_jobs, n_cores), 1)
+    return n_concurrent, max(n_cores // n_concurrent, 1)
+
+
+def _run_training_job(job_id, train_func, args, params, progress, cancel_event, n_total, n_cores):
+    """
+    Run a training function in a worker process on n_cores cores
+    
+    joblib's n_jobs=-1 (forests, search and budget pilots) resolves to
+    n_cores through LOKY_MAX_CPU_COUNT, and BLAS/OpenMP thread pools
+    (boosting) are capped to n_cores for the job. Progress is written
+    to the shared progress dict when the job starts and after every
+    batch of trees; a set cancel event stops training at the next
+    batch.
+    
+    Returns:
+        dict: train_model result
+    """
+    def report(n_done, n_total):
+        progress[job_id] = (n_done, n_total)
+        return not cancel_event.is_set()
+    
+    report(0, n_total)
+    os.environ['LOKY_MAX_CPU_COUNT'] = str(n_cores)
+    with threadpool_limits(limits=n_cores):
+        return train_func(*args, progress_callback=report, **params)
+
+
+class TrainingJobExecutor:
+    """
+    Run train_model, train_model_oob, train_until_converged,
+    train_within_budget, grow_forest, train_with_cross_validation and
+    search_hyperparameters jobs in a process pool
+    
+    Jobs outlive the Streamlit script run that submitted them, so a
+    rerun or page change no longer discards a fit in progress; the page
+    polls status() and picks the model up with result(). The executor
+    is shared by all sessions and schedules the server's training
+    cores: at most max_workers jobs train at the same time, each on
+    cores_per_job cores (see allocate_cores), and later ones wait in
+    the pool's queue in submission order. The pool and the progress
+    manager start on first use. A finished job whose result nobody takes
+    (the tab was closed or the session expired) is dropped job_ttl
+    seconds after it finished.
+    
+    Args:
+        max_workers: jobs wanted at the same time
+        n_cores: cores shared by all jobs (None = every usable core)
+        job_ttl: seconds a finished job is kept for result()
+    """
+    
+    def __init__(self, max_workers=TRAINING_MAX_CONCURRENT_JOBS, n_cores=TRAINING_CPU_CORES,
+                 job_ttl=TRAINING_JOB_TTL_SECONDS):
+        self.max_workers, self.cores_per_job = allocate_cores(n_cores, max_workers)
+        self.job_ttl = job_ttl
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._manager = None
+        self._progress = None
+    
+    def _start(self):
+        context = multiprocessing.get_context(MP_START_METHOD)
+        self._manager = context.Manager()
+        self._progress = self._manager.dict()
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+    
+    def _drop_expired(self):
+        # Caller holds the lock
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job['finished_at'] is not None and now - job['finished_at'] > self.job_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._progress.pop(job_id, None)
+    
+    def submit(self, X, y, preprocessor, **params):
+        """
+        Queue a training job
+        
+        Args:
+            X: features DataFrame
+            y: target Series
+            preprocessor: unfitted preprocessing pipeline
+            **params: remaining train_model arguments (train_size,
+                random_state, n_estimators, ...)
+                
+        Returns:
+            int: job id
+        """
+        return self._submit(train_model, (X, y, preprocessor), params, params.get('n_estimators', 0))
+    
+    def submit_oob(self, X, y, preprocessor, **params):
+        """
+        Queue a training job on all rows with out-of-bag evaluation (see
+        train_model_oob)
+        
+        Args:
+            X: features DataFrame
+            y: target Series
+            preprocessor: unfitted preprocessing pipeline
+            **params: remaining train_model_oob arguments
+            
+        Returns:
+            int: job id
+        """
+        return self._submit(train_model_oob, (X, y, preprocessor), params, params.get('n_estimators', 0))
+    
+    def submit_until_converged(self, X, y, preprocessor, **params):
+        """
+        Queue a training job that stops adding trees once the
+        out-of-bag error converges (see train_until_converged)
+        
+        Args:
+            X: features DataFrame
+            y: target Series
+            preprocessor: unfitted preprocessing pipeline
+            **params: remaining train_until_converged arguments
+            
+        Returns:
+            int: job id
+        """
+        return self._submit(
+            train_until_converged, (X, y, preprocessor), params, params.get('n_estimators', 0)
+        )
+    
+    def submit_budgeted(self, X, y, preprocessor, time_budget, **params):
+        """
+        Queue a training job sized to a time budget (see
+        train_within_budget)
+        
+        Args:
+            X: features DataFrame
+            y: target Series
+            preprocessor: unfitted preprocessing pipeline
+            time_budget: seconds for the training run
+            **params: remaining train_within_budget arguments
+            
+        Returns:
+            int: job id
+        """
+        return self._submit(
+            train_within_budget, (X, y, preprocessor, time_budget), params,
+            params.get('n_estimators', 0)
+        )
+    
+    def submit_growth(self, train_result, n_estimators):
+        """
+        Queue a job changing the tree count of a trained model (see
+        grow_forest)
+        
+        Args:
+            train_result: dict returned by train_model
+            n_estimators: new number of trees
+            
+        Returns:
+            int: job id
+        """
+        return self._submit(grow_forest, (train_result, n_estimators), {}, n_estimators)
+    
+    def submit_cross_validation(self, X, y, preprocessor, **params):
+        """
+        Queue a training job with K-fold cross-validation (see
+        train_with_cross_validation)
+        
+        Args:
+            X: features DataFrame
+            y: target Series
+            preprocessor: unfitted preprocessing pipeline
+            **params: remaining train_with_cross_validation arguments
+            
+        Returns:
+            int: job id
+        """
+        return self._submit(
+            train_with_cross_validation, (X, y, preprocessor), params, params.get('n_splits', 0) + 1
+        )
+    
+    def submit_search(self, X, y, preprocessor, **params):
+        """
+        Queue a hyperparameter search (see search_hyperparameters)
+        
+        Args:
+            X: features DataFrame
+            y: target Series
+            preprocessor: unfitted preprocessing pipeline
+            **params: remaining search_hyperparameters arguments
+            
+        Returns:
+            int: job id
+        """
+        return self._submit(search_hyperparameters, (X, y, preprocessor), params, 0)
+    
+    def _submit(self, train_func, args, params, n_total):
+        with self._lock:
+            if self._pool is None:
+                self._start()
+            self._drop_expired()
+            job_id = next(self._ids)
+            cancel_event = self._manager.Event()
+            future = self._pool.submit(
+                _run_training_job, job_id, train_func, args, params,
+                self._progress, cancel_event, n_total, self.cores_per_job
+            )
+            job = {
+                'future': future,
+                'cancel_event': cancel_event,
+                'n_total': n_total,
+                'finished_at': None
+            }
+            
+            def mark_finished(_future):
+                job['finished_at'] = time.monotonic()
+            
+            future.add_done_callback(mark_finished)
+            self._jobs[job_id] = job
+            return job_id
+    
+    def status(self, job_id):
+        """
+        Report the state of a job
+        
+        Args:
+            job_id: id returned by submit
+            
+        Returns:
+            dict: 'state' ('queued', 'running', 'done', 'failed',
+            'cancelled' or 'unknown', also once an unclaimed result
+            expired), 'n_done', 'n_total', 'cores'
+            (cores per job), for queued jobs 'position' (1 = next to
+            start) and 'n_running', and for failed jobs 'error' and
+            'traceback'
+        """
+        with self._lock:
+            if self._jobs:
+                self._drop_expired()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return {'state': 'unknown', 'n_done': 0, 'n_total': 0}
+            future = job['future']
+            progress = dict(self._progress)
+            n_done, n_total = progress.get(job_id, (0, job['n_total']))
+            # Pending jobs of every session, in submission order
+            waiting = [
+                other_id for other_id, other in self._jobs.items()
+                if not other['future'].done() and other_id not in progress
+                and not other['cancel_event'].is_set()
+            ]
+            n_running = sum(
+                1 for other_id, other in self._jobs.items()
+                if not other['future'].done() and other_id in progress
+            )
+        
+        status = {'n_done': n_done, 'n_total': n_total, 'cores': self.cores_per_job}
+        if future.cancelled():
+            status['state'] = 'cancelled'
+        elif future.done():
+            error = future.exception()
+            if error is None:
+                status['state'] = 'done'
+            elif isinstance(error, TrainingCancelled):
+                status['state'] = 'cancelled'
+            else:
+                status['state'] = 'failed'
+                status['error'] = str(error)
+                status['traceback'] = ''.join(traceback.format_exception(error))
+        elif job['cancel_event'].is_set():
+            status['state'] = 'cancelled'
+        else:
+            # A job counts as running once its worker reported progress
+            status['state'] = 'running' if job_id in progress else 'queued'
+            if status['state'] == 'queued':
+                status['position'] = sorted(waiting).index(job_id) + 1
+                status['n_running'] = n_running
+        return status
+    
+    def cancel(self, job_id):
+        """
+        Cancel a job; a queued job never starts, a running one stops
+        after its current batch of trees
+        
+        Args:
+            job_id: id returned by submit
+            
+        Returns:
+            bool: False when the job is unknown or already finished
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['future'].done():
+                return False
+            job['cancel_event'].set()
+            job['future'].cancel()
+            return True
+    
+    def result(self, job_id):
+        """
+        Take the result of a finished job and forget the job
+        
+        Args:
+            job_id: id returned by submit
+            
+        Returns:
+            dict: train_model result
+            
+        Raises:
+            KeyError: when the job is unknown
+            Exception: whatever the job raised
+        """
+        with self._lock:
+            job = self._jobs.pop(job_id)
+            self._progress.pop(job_id, None)
+        return job['future'].result()
+    
+    def forget(self, job_id):
+        """Drop a job, cancelling it when it is still queued or running"""
+        self.cancel(job_id)
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            if self._progress is not None:
+                self._progress.pop(job_id, None)
+
+
+# Process-wide executor shared by all sessions
+_training_executor = TrainingJobExecutor()
+
+
+def get_training_executor():
+    """Get the process-wide training job executor"""
+    return _training_executor
@@ -3,13 +3,21 @@ ForestCal - Aplikasi Analisis dan Prediksi Pembakaran Kalori
 Main orchestrator file
 """
 
+import pandas as pd
 import streamlit as st
 
+# Sessions share cached DataFrames through shallow copies (see
+# utils.dataset_cache.DatasetHandle); copy-on-write keeps a session's
+# writes from reaching the shared data. pandas 3 always works this
+# way, pandas 2 needs the opt-in.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
 # Import configuration
 from config.settings import PAGE_CONFIG, MENU_ITEMS
 
 # Import utilities
-from utils.session_manager import initialize_session_state, navigate_to
+from utils.session_manager import initialize_session_state, navigate_to, describe_live_model
 
 # Import styling
 from styles.custom_css import get_custom_css
@@ -26,7 +34,12 @@ from app_pages import (
 
 
 def render_sidebar():
-    """Render sidebar navigation"""
+    """
+    Render sidebar navigation
+    
+    Returns:
+        placeholder showing the live model (see render_live_model)
+    """
     with st.sidebar:
         st.markdown('<div class="logo">ForestCal</div>', unsafe_allow_html=True)
         
@@ -50,6 +63,21 @@ def render_sidebar():
         if st.button("Analisis", key="menu_analisis_pribadi", 
                     use_container_width=True, type=personal_button_type):
             navigate_to('Analisis Pribadi')
+        
+        # Which model the analysis pages use; refreshed after the page
+        # ran, since training can replace the model
+        live_model_slot = st.empty()
+        render_live_model(live_model_slot)
+    return live_model_slot
+
+
+def render_live_model(slot):
+    """Show the live model in a sidebar placeholder"""
+    live_model = describe_live_model()
+    if live_model is None:
+        slot.empty()
+    else:
+        slot.caption(f"Model aktif: {live_model}")
 
 
 def render_current_page():
@@ -84,12 +112,13 @@ def main():
     initialize_session_state()
     
     # Render sidebar navigation
-    render_sidebar()
+    live_model_slot = render_sidebar()
     
     # Render main content
     st.markdown('<div class="main-content">', unsafe_allow_html=True)
     render_current_page()
     st.markdown('</div>', unsafe_allow_html=True)
+    render_live_model(live_model_slot)
     
     # Footer
     st.markdown("---")
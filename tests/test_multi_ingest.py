@@ -0,0 +1,40 @@
+"""
+Tests for the ingest-root checks of multi-file CSV ingestion
+"""
+import os
+
+import pytest
+
+from utils.multi_ingest import resolve_ingest_directory, list_dataset_files
+
+
+@pytest.fixture
+def ingest_tree(tmp_path):
+    root = tmp_path / "root"
+    (root / "daily").mkdir(parents=True)
+    (root / "daily" / "a.csv").write_text("x\n1\n")
+    (root / "daily" / "b.csv.gz").write_bytes(b"")
+    (root / "daily" / "notes.txt").write_text("x\n")
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "secret.csv").write_text("x\n1\n")
+    os.symlink(outside, root / "escape")
+    os.symlink(outside / "secret.csv", root / "daily" / "link.csv")
+    return root
+
+
+def test_disabled_without_root():
+    with pytest.raises(ValueError):
+        resolve_ingest_directory("daily", root=None)
+
+
+@pytest.mark.parametrize("directory", ["..", "../outside", "escape", "/etc"])
+def test_rejects_directories_outside_root(ingest_tree, directory):
+    with pytest.raises(ValueError):
+        resolve_ingest_directory(directory, root=str(ingest_tree))
+
+
+def test_lists_only_csv_files_inside_root(ingest_tree):
+    paths = list_dataset_files("daily", "*", root=str(ingest_tree))
+    assert [os.path.basename(p) for p in paths] == ["a.csv", "b.csv.gz"]
+    assert list_dataset_files("daily", "../../outside/*", root=str(ingest_tree)) == []
@@ -0,0 +1,34 @@
+"""
+Tests for utils.sampling
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.sampling import stratified_sample
+
+
+def _chunks(df, chunk_rows=1000):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+@pytest.mark.parametrize("n_rows", [3, 5, 1000, 19_999, 50_000])
+def test_stratified_sample_has_exactly_n_rows(n_rows):
+    """The sample never exceeds n_rows, also with more strata than rows"""
+    rng = np.random.default_rng(0)
+    strata = rng.choice(list('ABCDE'), p=[.6, .3, .08, .019, .001], size=20_000)
+    df = pd.DataFrame({'s': strata, 'x': np.arange(len(strata))})
+    
+    sample, population = stratified_sample(_chunks(df), n_rows, 's')
+    
+    assert population == len(df)
+    assert len(sample) == min(n_rows, len(df))
+    assert sample['x'].is_monotonic_increasing
+    if n_rows >= 5:
+        assert sample['s'].nunique() == 5
+    if n_rows == 1000:
+        expected = df['s'].value_counts() * n_rows / len(df)
+        counts = sample['s'].value_counts().reindex(expected.index)
+        # Proportional up to the one-row minimum per stratum and rounding
+        assert ((counts - expected).abs() <= 0.005 * n_rows).all()
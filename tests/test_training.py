@@ -0,0 +1,26 @@
+"""
+Tests for ml_models.training
+"""
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from ml_models.training import train_until_converged
+
+
+def test_train_until_converged_stops_on_noisy_target():
+    """A noisy OOB MAE still converges well before the tree cap"""
+    n_estimators = 500
+    for seed in range(4):
+        rng = np.random.default_rng(seed)
+        X = pd.DataFrame(rng.normal(size=(3000, 5)), columns=list('abcde'))
+        y = pd.Series(2 * X['a'] + rng.normal(scale=3.0, size=len(X)))
+        
+        result = train_until_converged(
+            X, y, StandardScaler(), random_state=seed, n_estimators=n_estimators
+        )
+        n_trees = len(result['pipeline'].named_steps['model'].estimators_)
+        
+        assert result['converged']
+        assert n_trees == result['oob_curve']['n_trees'].iloc[-1]
+        assert n_trees <= n_estimators // 2
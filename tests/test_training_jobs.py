@@ -0,0 +1,33 @@
+"""
+Tests for the background training job executor
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from ml_models.preprocessing import create_preprocessor
+from ml_models.training_jobs import TrainingJobExecutor
+
+
+def _wait(executor, job_id, timeout=120):
+    deadline = time.monotonic() + timeout
+    while executor.status(job_id)['state'] in ('queued', 'running'):
+        assert time.monotonic() < deadline
+        time.sleep(0.1)
+
+
+def test_unclaimed_finished_job_expires():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'a': rng.normal(size=200), 'b': rng.normal(size=200)})
+    y = pd.Series(X['a'] * 2 + rng.normal(size=200))
+    executor = TrainingJobExecutor(max_workers=1, n_cores=1, job_ttl=0.5)
+    params = dict(n_estimators=5, random_state=0)
+    
+    job_id = executor.submit(X, y, create_preprocessor(['a', 'b'], []), **params)
+    _wait(executor, job_id)
+    assert executor.status(job_id)['state'] == 'done'
+    
+    time.sleep(1)
+    assert executor.status(job_id)['state'] == 'unknown'
+    assert job_id not in executor._progress
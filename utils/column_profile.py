@@ -0,0 +1,80 @@
+"""
+Column profiling index for ForestCal application
+"""
+import numpy as np
+import pandas as pd
+from config.settings import PROFILE_TOP_CATEGORIES
+
+
+def is_categorical_dtype(dtype):
+    """
+    Check whether a column dtype holds categorical (text) data
+    
+    Args:
+        dtype: pandas or numpy dtype
+        
+    Returns:
+        bool
+    """
+    return (
+        dtype == 'object'
+        or isinstance(dtype, pd.CategoricalDtype)
+        or pd.api.types.is_string_dtype(dtype)
+    )
+
+
+def build_column_profile(df, top_k=PROFILE_TOP_CATEGORIES):
+    """
+    Profile every column of a dataset in one pass per dtype block
+    
+    Numeric columns get min/median/max from a single quantile call over
+    the numeric block; categorical columns get cardinality and their most
+    frequent values from one value_counts each.
+    
+    Args:
+        df: pandas DataFrame
+        top_k: number of most frequent categories kept per column
+        
+    Returns:
+        pandas DataFrame indexed by column name with 'dtype', 'n_null',
+        'is_numeric', 'is_categorical', 'min', 'median', 'max',
+        'n_unique' and 'top_categories'
+    """
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    categorical_cols = [c for c in df.columns if is_categorical_dtype(df[c].dtype)]
+    other_cols = [
+        c for c in df.columns
+        if c not in numeric_cols and c not in categorical_cols
+    ]
+    
+    profile = pd.DataFrame(index=df.columns)
+    profile['dtype'] = df.dtypes.astype(str)
+    profile['n_null'] = df.isna().sum()
+    profile['is_numeric'] = profile.index.isin(numeric_cols)
+    profile['is_categorical'] = profile.index.isin(categorical_cols)
+    profile['min'] = np.nan
+    profile['median'] = np.nan
+    profile['max'] = np.nan
+    profile['n_unique'] = 0
+    profile['top_categories'] = None
+    
+    if len(numeric_cols):
+        quantiles = df[numeric_cols].quantile([0.0, 0.5, 1.0])
+        profile.loc[numeric_cols, 'min'] = quantiles.loc[0.0]
+        profile.loc[numeric_cols, 'median'] = quantiles.loc[0.5]
+        profile.loc[numeric_cols, 'max'] = quantiles.loc[1.0]
+        profile.loc[numeric_cols, 'n_unique'] = df[numeric_cols].nunique()
+    
+    top_categories = {}
+    for c in categorical_cols:
+        counts = df[c].value_counts()
+        counts = counts[counts > 0]
+        profile.loc[c, 'n_unique'] = len(counts)
+        top_categories[c] = counts.index[:top_k].tolist()
+    if top_categories:
+        profile['top_categories'] = pd.Series(top_categories, dtype=object)
+    
+    if other_cols:
+        profile.loc[other_cols, 'n_unique'] = df[other_cols].nunique()
+    
+    return profile
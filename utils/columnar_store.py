@@ -0,0 +1,200 @@
+"""
+Columnar (Parquet / Arrow IPC) dataset storage for ForestCal application
+"""
+import os
+
+from config.settings import COLUMNAR_STORE_DIR, CSV_CHUNK_ROWS
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Upload extensions read as columnar files
+COLUMNAR_FORMATS = {
+    'parquet': 'parquet',
+    'arrow': 'ipc',
+    'feather': 'ipc'
+}
+
+# Schema metadata key holding the original file name
+NAME_METADATA_KEY = b'forestcal.name'
+
+
+def is_columnar_available():
+    """Check whether pyarrow is installed"""
+    return pa is not None
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow belum terpasang. Jalankan: pip install pyarrow")
+
+
+def get_columnar_format(filename):
+    """
+    Get the columnar format of a file from its extension
+    
+    Args:
+        filename: file name or path
+        
+    Returns:
+        str: 'parquet', 'ipc' or None for non-columnar files
+    """
+    ext = os.path.splitext(filename)[1].lower().lstrip('.')
+    return COLUMNAR_FORMATS.get(ext)
+
+
+def _table_to_frame(table, columns=None):
+    """
+    Convert an Arrow table to pandas, keeping only the given columns
+    
+    split_blocks lets null-free numeric columns stay zero-copy views on
+    the Arrow buffers instead of being consolidated into a new block.
+    """
+    if columns is not None:
+        table = table.select(list(columns))
+    return table.to_pandas(split_blocks=True)
+
+
+def read_columnar_bytes(raw_bytes, fmt, columns=None):
+    """
+    Read an uploaded Parquet or Arrow IPC file
+    
+    Args:
+        raw_bytes: file content
+        fmt: 'parquet' or 'ipc'
+        columns: optional list of columns to read
+        
+    Returns:
+        pandas DataFrame
+    """
+    _require_pyarrow()
+    buffer = pa.BufferReader(raw_bytes)
+    if fmt == 'parquet':
+        return pq.read_table(buffer, columns=columns).to_pandas()
+    return _table_to_frame(ipc.open_file(buffer).read_all(), columns)
+
+
+def get_stored_path(key):
+    """Path of the stored Arrow file for a dataset content hash"""
+    return os.path.join(COLUMNAR_STORE_DIR, f"{key}.arrow")
+
+
+def save_columnar(df, key, name):
+    """
+    Write a parsed dataset once as an uncompressed Arrow IPC file
+    
+    Uncompressed IPC can be memory-mapped and read without a copy, so
+    later sessions only touch the pages of the columns they select.
+    
+    Args:
+        df: parsed pandas DataFrame
+        key: content hash of the original upload
+        name: original file name, kept in the schema metadata
+        
+    Returns:
+        str: path of the stored file
+    """
+    _require_pyarrow()
+    os.makedirs(COLUMNAR_STORE_DIR, exist_ok=True)
+    path = get_stored_path(key)
+    if os.path.exists(path):
+        return path
+    
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[NAME_METADATA_KEY] = name.encode('utf-8')
+    table = table.replace_schema_metadata(metadata)
+    
+    # Write to a temporary file first so readers never see a partial file
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def open_columnar(path, columns=None):
+    """
+    Reopen a stored Arrow file memory-mapped
+    
+    Args:
+        path: path of the stored Arrow file
+        columns: optional list of columns to read; other columns are
+            never paged in
+            
+    Returns:
+        pandas DataFrame
+    """
+    _require_pyarrow()
+    # The mapping stays open for as long as the frame references it
+    source = pa.memory_map(path, 'r')
+    table = ipc.open_file(source).read_all()
+    return _table_to_frame(table, columns)
+
+
+def iter_columnar_chunks(fmt, data=None, path=None, columns=None, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Iterate over a Parquet or Arrow IPC source in row chunks
+    
+    Arrow files on disk are memory-mapped and sliced without copying,
+    so only one chunk is converted to pandas at a time.
+    
+    Args:
+        fmt: 'parquet' or 'ipc'
+        data: file content (uploaded files)
+        path: file path (stored files)
+        columns: optional list of columns to read
+        chunk_rows: number of rows per chunk
+        
+    Returns:
+        iterator of pandas DataFrame
+    """
+    _require_pyarrow()
+    if fmt == 'parquet':
+        parquet_file = pq.ParquetFile(pa.BufferReader(data) if data is not None else path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+        return
+    
+    source = pa.memory_map(path, 'r') if path else pa.BufferReader(data)
+    reader = ipc.open_file(source)
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        if columns is not None:
+            batch = batch.select(list(columns))
+        for offset in range(0, batch.num_rows, chunk_rows):
+            yield batch.slice(offset, chunk_rows).to_pandas()
+
+
+def list_stored_datasets():
+    """
+    List datasets kept in COLUMNAR_STORE_DIR
+    
+    Returns:
+        list: dicts with 'key', 'name', 'path' and 'size_mb'
+    """
+    if pa is None or not os.path.isdir(COLUMNAR_STORE_DIR):
+        return []
+    
+    datasets = []
+    for filename in sorted(os.listdir(COLUMNAR_STORE_DIR)):
+        if not filename.endswith('.arrow'):
+            continue
+        path = os.path.join(COLUMNAR_STORE_DIR, filename)
+        try:
+            with pa.memory_map(path, 'r') as source:
+                metadata = ipc.open_file(source).schema.metadata or {}
+        except (OSError, pa.ArrowInvalid):
+            continue
+        datasets.append({
+            'key': filename[:-len('.arrow')],
+            'name': metadata.get(NAME_METADATA_KEY, filename.encode()).decode('utf-8'),
+            'path': path,
+            'size_mb': os.path.getsize(path) / (1024 * 1024)
+        })
+    return datasets
@@ -1,50 +1,411 @@
 """
 Data handling utilities for ForestCal application
 """
-import pandas as pd
+import io
+import os
 import streamlit as st
-from config.settings import MAX_FILE_SIZE_MB
+from config.settings import (
+    MAX_FILE_SIZE_MB,
+    DEFAULT_RANDOM_STATE,
+    MULTI_INGEST_PATTERN,
+    CSV_CHUNK_ROWS,
+    CATEGORY_MAX_UNIQUE,
+    STRATIFY_PEEK_ROWS
+)
+from utils.dataset_cache import compute_content_hash, get_dataset_cache
+from utils.ingestion import read_csv_chunked, iter_csv_chunks, shrink_dtypes
+from utils.multi_ingest import (
+    resolve_ingest_directory,
+    list_dataset_files,
+    fingerprint_files,
+    ingest_csv_files,
+)
+from utils.sampling import reservoir_sample, stratified_sample, sampling_error
+from utils.column_profile import build_column_profile, is_categorical_dtype
+from utils.columnar_store import (
+    is_columnar_available,
+    get_columnar_format,
+    read_columnar_bytes,
+    get_stored_path,
+    save_columnar,
+    open_columnar,
+    iter_columnar_chunks
+)
 
 
-def load_dataset(uploaded_file):
+SAMPLE_DATASET_PATH = "exercise_dataset.csv"
+
+
+def _cache_dataset(key, df, **extra):
+    """
+    Profile a freshly loaded dataset and store it in the cache
+    
+    Args:
+        key: content hash of the dataset
+        df: loaded pandas DataFrame
+        **extra: additional fields stored on the cache entry
+        
+    Returns:
+        dict: cache entry
+    """
+    profile = build_column_profile(df)
+    return get_dataset_cache().put(
+        key, df, validate_dataset(df, profile), profile=profile, **extra
+    )
+
+
+def _parse_cached(key, raw_bytes, filename):
+    """
+    Parse file bytes, reusing the cached frame when the content is known
+    
+    A content hash that was kept earlier as an Arrow file is reopened
+    memory-mapped instead of being parsed again.
+    
+    Args:
+        key: content hash of raw_bytes
+        raw_bytes: raw file content
+        filename: original file name (selects CSV or columnar reader)
+        
+    Returns:
+        tuple: (cache entry, from_cache)
+    """
+    entry = get_dataset_cache().get(key)
+    if entry is not None:
+        return entry, True
+    
+    stored_path = get_stored_path(key)
+    columnar_format = get_columnar_format(filename)
+    extra = {}
+    if is_columnar_available() and os.path.exists(stored_path):
+        df = open_columnar(stored_path)
+        extra['columnar_path'] = stored_path
+    elif columnar_format:
+        df = read_columnar_bytes(raw_bytes, columnar_format)
+    else:
+        df, extra['ingest_report'] = read_csv_chunked(io.BytesIO(raw_bytes))
+    
+    entry = _cache_dataset(key, df, **extra)
+    return entry, False
+
+
+def _make_source(key, raw_bytes, filename):
+    """
+    Describe where the full dataset can be streamed from
+    
+    Args:
+        key: content hash of raw_bytes
+        raw_bytes: raw file content
+        filename: original file name
+        
+    Returns:
+        dict: {'format': 'csv'|'parquet'|'ipc', 'data': bytes or None,
+               'path': stored Arrow path or None}
+    """
+    stored_path = get_stored_path(key)
+    if is_columnar_available() and os.path.exists(stored_path):
+        return {'format': 'ipc', 'data': None, 'path': stored_path}
+    return {
+        'format': get_columnar_format(filename) or 'csv',
+        'data': raw_bytes,
+        'path': None
+    }
+
+
+def _iter_source_chunks(source, columns=None, chunk_rows=CSV_CHUNK_ROWS):
+    """Iterate over the full dataset of a source in chunks"""
+    if source['format'] == 'csv':
+        return iter_csv_chunks(io.BytesIO(source['data']), columns, chunk_rows)
+    return iter_columnar_chunks(source['format'], source['data'], source['path'], columns, chunk_rows)
+
+
+def _read_source_columns(source, columns):
+    """Read the given columns of the full dataset of a source"""
+    if source['format'] == 'csv':
+        df, _ = read_csv_chunked(io.BytesIO(source['data']), usecols=columns)
+        return df[columns]
+    if source['path']:
+        return open_columnar(source['path'], columns)
+    return read_columnar_bytes(source['data'], source['format'], columns)
+
+
+def _sample_cached(key, source, sample_rows, stratify_col=None):
+    """
+    Stream over a source once and keep a sample for exploration
+    
+    Args:
+        key: content hash of the full dataset
+        source: dict from _make_source
+        sample_rows: sample size
+        stratify_col: optional column for a stratified sample
+        
+    Returns:
+        tuple: (cache entry, from_cache)
+    """
+    sample_key = f"{key}:sample:{sample_rows}:{stratify_col or ''}"
+    entry = get_dataset_cache().get(sample_key)
+    if entry is not None:
+        return entry, True
+    
+    chunks = _iter_source_chunks(source)
+    if stratify_col:
+        sample, n_population = stratified_sample(
+            chunks, sample_rows, stratify_col, DEFAULT_RANDOM_STATE
+        )
+    else:
+        sample, n_population = reservoir_sample(chunks, sample_rows, DEFAULT_RANDOM_STATE)
+    sample = shrink_dtypes(sample)
+    
+    sample_info = {
+        'n_sample': len(sample),
+        'n_population': n_population,
+        'stratify_col': stratify_col,
+        'error': sampling_error(sample, n_population)
+    }
+    entry = _cache_dataset(
+        sample_key, sample,
+        extra_nbytes=len(source['data'] or b''),
+        sample=sample_info,
+        source=source
+    )
+    return entry, False
+
+
+def _load_bytes(raw_bytes, filename, sample_rows=None, stratify_col=None):
+    """Load raw file bytes fully or, in sampling mode, as a sample"""
+    key = compute_content_hash(raw_bytes)
+    if sample_rows:
+        source = _make_source(key, raw_bytes, filename)
+        return _sample_cached(key, source, sample_rows, stratify_col)
+    return _parse_cached(key, raw_bytes, filename)
+
+
+def _keep_columnar(entry, name):
+    """
+    Write a dataset once as an Arrow file for memory-mapped reopening
+    
+    Args:
+        entry: cache entry of the dataset
+        name: original file name
+        
+    Returns:
+        str: path of the stored file
+    """
+    if not entry.get('columnar_path'):
+        entry['columnar_path'] = save_columnar(entry['df'], entry['key'], name)
+    return entry['columnar_path']
+
+
+def load_dataset(uploaded_file, keep_columnar=False, sample_rows=None, stratify_col=None):
     """
     Load dataset from uploaded file or use default
     
+    Parsed datasets are cached by content hash, so a rerun with the
+    same file skips parsing. CSVs are read in chunks with narrow dtypes
+    (see utils.ingestion.read_csv_chunked); Parquet and Arrow IPC files
+    are read directly.
+    
+    In sampling mode only a streaming reservoir (or stratified) sample is
+    kept in memory; load_columns streams over the full data for training.
+    
     Args:
         uploaded_file: Streamlit UploadedFile object
+        keep_columnar: write the parsed dataset as an Arrow file that
+            later sessions reopen memory-mapped (ignored when sampling)
+        sample_rows: sample size for sampling mode, None to load all rows
+        stratify_col: optional column for a stratified sample
         
     Returns:
-        tuple: (dataframe, message, message_type)
+        tuple: (dataframe, message, message_type, dataset_info)
+            dataset_info is the cache entry with 'key', 'stats',
+            'profile', 'dtypes', 'nbytes' and, when available,
+            'ingest_report', 'columnar_path', 'sample' and 'source',
+            or None when nothing was loaded
     """
     if uploaded_file is not None:
         try:
             # Check file size
             file_size_mb = uploaded_file.size / (1024 * 1024)
             if file_size_mb > MAX_FILE_SIZE_MB:
-                return None, f"File terlalu besar! Maksimal {MAX_FILE_SIZE_MB}MB", "error"
+                return None, f"File terlalu besar! Maksimal {MAX_FILE_SIZE_MB}MB", "error", None
             
-            df = pd.read_csv(uploaded_file)
+            entry, from_cache = _load_bytes(
+                uploaded_file.getvalue(), uploaded_file.name, sample_rows, stratify_col
+            )
             message = f"✅ Dataset berhasil di-upload! ({uploaded_file.size / 1024:.2f} KB)"
-            return df, message, "success"
+            if from_cache:
+                message += " ⚡ dari cache"
+            if keep_columnar and not sample_rows:
+                _keep_columnar(entry, uploaded_file.name)
+                message += " 📦 tersimpan sebagai Arrow"
+            return entry['df'], message, "success", entry
             
         except Exception as e:
-            return None, f"Gagal membaca file: {e}", "error"
+            return None, f"Gagal membaca file: {e}", "error", None
     else:
         # Try to load sample dataset
         try:
-            df = pd.read_csv("exercise_dataset.csv")
-            message = "📁 Menggunakan dataset contoh: exercise_dataset.csv"
-            return df, message, "info"
+            with open(SAMPLE_DATASET_PATH, 'rb') as f:
+                entry, _ = _load_bytes(f.read(), SAMPLE_DATASET_PATH, sample_rows, stratify_col)
+            message = f"📁 Menggunakan dataset contoh: {SAMPLE_DATASET_PATH}"
+            return entry['df'], message, "info", entry
         except:
-            return None, None, None
+            return None, None, None, None
+
+
+def list_stratify_columns(uploaded_file=None, stored=None):
+    """
+    Categorical columns of the file about to be sampled
+    
+    Only the first STRATIFY_PEEK_ROWS rows are parsed, so the choices
+    follow the file being loaded rather than the active dataset.
+    Columns with more than CATEGORY_MAX_UNIQUE distinct values there
+    (missing counted as one) are left out, since strata that small say
+    little about the population.
+    
+    Args:
+        uploaded_file: Streamlit UploadedFile object, or None for the
+            sample dataset load_dataset falls back to
+        stored: dict from utils.columnar_store.list_stored_datasets
+            (takes precedence over uploaded_file)
+            
+    Returns:
+        list: column names, empty when the file cannot be read
+    """
+    try:
+        if stored is not None:
+            source = {'format': 'ipc', 'data': None, 'path': stored['path']}
+        elif uploaded_file is not None:
+            source = {
+                'format': get_columnar_format(uploaded_file.name) or 'csv',
+                'data': uploaded_file.getvalue(),
+                'path': None
+            }
+        else:
+            with open(SAMPLE_DATASET_PATH, 'rb') as f:
+                source = {'format': 'csv', 'data': f.read(), 'path': None}
+        chunk = next(iter(_iter_source_chunks(source, chunk_rows=STRATIFY_PEEK_ROWS)), None)
+    except Exception:
+        return []
+    if chunk is None:
+        return []
+    return [
+        c for c in chunk.columns
+        if is_categorical_dtype(chunk[c].dtype)
+        and chunk[c].nunique(dropna=False) <= CATEGORY_MAX_UNIQUE
+    ]
+
+
+def load_stored_dataset(stored, sample_rows=None, stratify_col=None):
+    """
+    Reopen a dataset kept as an Arrow file, memory-mapped
+    
+    Args:
+        stored: dict from utils.columnar_store.list_stored_datasets
+        sample_rows: sample size for sampling mode, None to load all rows
+        stratify_col: optional column for a stratified sample
+        
+    Returns:
+        tuple: (dataframe, message, message_type, dataset_info)
+    """
+    try:
+        if sample_rows:
+            source = {'format': 'ipc', 'data': None, 'path': stored['path']}
+            entry, _ = _sample_cached(stored['key'], source, sample_rows, stratify_col)
+        else:
+            entry = get_dataset_cache().get(stored['key'])
+            if entry is None:
+                df = open_columnar(stored['path'])
+                entry = _cache_dataset(stored['key'], df, columnar_path=stored['path'])
+        message = f"📦 Membuka dataset tersimpan: {stored['name']} ({stored['size_mb']:.1f} MB, memory-mapped)"
+        return entry['df'], message, "success", entry
+    except Exception as e:
+        return None, f"Gagal membuka dataset tersimpan: {e}", "error", None
 
 
-def validate_dataset(df):
+def load_csv_directory(directory, pattern=MULTI_INGEST_PATTERN):
+    """
+    Load and concatenate all CSV files of a directory in parallel
+    
+    Files (plain, .gz or .zst) are parsed in a process pool; the result
+    is cached under a fingerprint of the file names, sizes and mtimes.
+    Only folders and files below MULTI_INGEST_ROOT are read.
+    
+    Args:
+        directory: folder with the daily CSV files, relative to
+            MULTI_INGEST_ROOT
+        pattern: glob pattern selecting the files
+        
+    Returns:
+        tuple: (dataframe, message, message_type, dataset_info)
+            dataset_info carries 'file_report' with per-file timing and
+            status, also when no file could be loaded
+    """
+    try:
+        try:
+            folder = resolve_ingest_directory(directory)
+        except ValueError as e:
+            return None, str(e), "error", None
+        if not os.path.isdir(folder):
+            return None, f"Folder tidak ditemukan: {directory}", "error", None
+        
+        paths = list_dataset_files(directory, pattern)
+        if not paths:
+            return None, f"Tidak ada file '{pattern}' di folder {directory}", "error", None
+        
+        key = f"dir:{fingerprint_files(paths)}"
+        entry = get_dataset_cache().get(key)
+        if entry is not None:
+            message = f"✅ Dataset folder dimuat ({len(entry['df']):,} baris) ⚡ dari cache"
+            return entry['df'], message, "success", entry
+        
+        df, file_report = ingest_csv_files(paths)
+        if df is None:
+            return None, "Tidak ada file yang bisa dibaca dengan schema yang sama", "error", {'file_report': file_report}
+        
+        entry = _cache_dataset(key, df, file_report=file_report)
+        n_ok = int((file_report['status'].isin(['ok', 'lambat'])).sum())
+        message = f"✅ {n_ok} dari {len(paths)} file dimuat dari folder ({len(df):,} baris)"
+        msg_type = "success" if n_ok == len(paths) else "warning"
+        return df, message, msg_type, entry
+    
+    except Exception as e:
+        return None, f"Gagal membaca folder: {e}", "error", None
+
+
+def load_columns(df, columns, dataset_info=None):
+    """
+    Get only the given columns of the active dataset
+    
+    When the dataset is backed by a stored Arrow file, only those
+    columns are read from the memory-mapped file. In sampling mode the
+    columns are streamed from the full source instead of the sample.
+    
+    Args:
+        df: active pandas DataFrame
+        columns: list of column names to keep
+        dataset_info: cache entry returned by load_dataset
+        
+    Returns:
+        pandas DataFrame
+    """
+    columns = list(dict.fromkeys(columns))
+    if dataset_info and dataset_info.get('sample'):
+        return _read_source_columns(dataset_info['source'], columns)
+    
+    columnar_path = dataset_info.get('columnar_path') if dataset_info else None
+    if columnar_path and is_columnar_available() and os.path.exists(columnar_path):
+        return open_columnar(columnar_path, columns)
+    return df[columns]
+
+
+def validate_dataset(df, profile=None):
     """
     Validate basic properties of the dataset
     
     Args:
         df: pandas DataFrame
+        profile: column profile from build_column_profile (built when
+            not given)
         
     Returns:
         dict: Dataset statistics
@@ -52,10 +413,13 @@ def validate_dataset(df):
     if df is None:
         return None
     
+    if profile is None:
+        profile = build_column_profile(df)
+    
     return {
         'n_rows': len(df),
         'n_cols': len(df.columns),
-        'n_missing': df.isnull().sum().sum(),
+        'n_missing': int(profile['n_null'].sum()),
         'columns': df.columns.tolist(),
         'dtypes': df.dtypes.to_dict()
     }
@@ -132,18 +496,18 @@ def suggest_feature_columns(all_columns, target_col, exclude_cols):
     return important_features
 
 
-def get_categorical_columns(df):
+def get_categorical_columns(df, profile=None):
     """
     Get list of categorical columns
     
     Args:
         df: pandas DataFrame
+        profile: optional column profile; read instead of the frame
         
     Returns:
         list: categorical column names
     """
-    return [
-        c for c in df.columns
-        if df[c].dtype == 'object' or df[c].dtype.name == 'category'
-    ]
-
+    if profile is not None:
+        return profile.index[profile['is_categorical']].tolist()
+    
+    return [c for c in df.columns if is_categorical_dtype(df[c].dtype)]
@@ -0,0 +1,231 @@
+"""
+Content-hash keyed dataset cache for ForestCal application
+
+The cache doubles as the process-wide dataset store shared by every
+browser session: sessions hold a DatasetHandle, and datasets referenced
+by at least one handle are pinned and never evicted.
+"""
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+
+from config.settings import DATASET_CACHE_MAX_MB
+
+
+def compute_content_hash(data):
+    """
+    Compute a content hash for raw file bytes
+    
+    Args:
+        data: bytes or memoryview with the file content
+        
+    Returns:
+        str: hex digest identifying the content
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class DatasetHandle:
+    """
+    Lightweight, immutable per-session reference to a shared dataset
+    
+    Pages read handle.df directly on every rerun without copying it.
+    Each access returns a shallow copy: reading costs nothing, and
+    under copy-on-write (always on in pandas 3, enabled by the app
+    entry point on pandas 2) a transformation that writes to it
+    materializes only the columns it touches, never the shared frame.
+    Without copy-on-write the copy shares its arrays with the cache and
+    must be treated as read-only: replacing whole columns is safe,
+    in-place writes (loc/iloc assignment, inplace=True) are not.
+    
+    The reference is released when release() is called or when the
+    handle is garbage collected together with its session state.
+    """
+    
+    __slots__ = ('_key', '_entry', '_finalizer', '__weakref__')
+    
+    def __init__(self, cache, entry):
+        self._key = entry['key']
+        self._entry = entry
+        self._finalizer = weakref.finalize(self, cache.release, self._key)
+    
+    @property
+    def key(self):
+        """Content hash of the dataset"""
+        return self._key
+    
+    @property
+    def df(self):
+        """Shallow copy of the shared DataFrame (see DatasetHandle)"""
+        return self._entry['df'].copy(deep=False)
+    
+    @property
+    def info(self):
+        """Cache entry with stats, profile and source information"""
+        return self._entry
+    
+    def release(self):
+        """Drop this session's reference (safe to call more than once)"""
+        self._finalizer()
+
+
+class DatasetCache:
+    """
+    LRU cache of parsed datasets bounded by a byte budget
+    
+    Each entry holds the parsed DataFrame together with its
+    validate_dataset stats and dtypes, so a Streamlit rerun with the
+    same file only costs a hash lookup. Entries pinned by a
+    DatasetHandle are shared across sessions and skipped by eviction;
+    the byte budget applies to the unpinned ones.
+    """
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._refcounts = {}
+        self._lock = threading.RLock()
+    
+    def get(self, key):
+        """
+        Get a cached entry and mark it as most recently used
+        
+        Args:
+            key: content hash of the dataset
+            
+        Returns:
+            dict or None: cached entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+    
+    def put(self, key, df, stats, extra_nbytes=0, **extra):
+        """
+        Store a parsed dataset, evicting least recently used entries
+        
+        The new entry itself is never evicted by this call, so the
+        caller can acquire it right away.
+        
+        Args:
+            key: content hash of the dataset
+            df: parsed pandas DataFrame
+            stats: dict returned by validate_dataset
+            extra_nbytes: bytes held by the entry besides the frame
+            **extra: additional fields stored on the entry
+            
+        Returns:
+            dict: the stored entry
+        """
+        nbytes = int(df.memory_usage(deep=True).sum()) + extra_nbytes
+        entry = {
+            'key': key,
+            'df': df,
+            'stats': stats,
+            'dtypes': df.dtypes.to_dict(),
+            'nbytes': nbytes,
+            **extra
+        }
+        
+        with self._lock:
+            self._insert(entry)
+            self._evict(keep=key)
+        
+        return entry
+    
+    def acquire(self, entry):
+        """
+        Pin a dataset for a session and return its handle
+        
+        Args:
+            entry: cache entry (re-inserted if it was evicted meanwhile)
+            
+        Returns:
+            DatasetHandle
+        """
+        with self._lock:
+            key = entry['key']
+            if key not in self._entries:
+                self._insert(entry)
+            self._entries.move_to_end(key)
+            self._refcounts[key] = self._refcounts.get(key, 0) + 1
+            return DatasetHandle(self, self._entries[key])
+    
+    def release(self, key):
+        """
+        Drop one session reference and trim unpinned entries
+        
+        Args:
+            key: content hash of the dataset
+        """
+        with self._lock:
+            count = self._refcounts.get(key, 0) - 1
+            if count > 0:
+                self._refcounts[key] = count
+            else:
+                self._refcounts.pop(key, None)
+            self._evict()
+    
+    def _insert(self, entry):
+        key = entry['key']
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)['nbytes']
+        self._entries[key] = entry
+        self.current_bytes += entry['nbytes']
+    
+    def _evict(self, keep=None):
+        """Evict unpinned entries, least recently used first, until within budget"""
+        for key in list(self._entries):
+            if self.current_bytes <= self.max_bytes:
+                break
+            if key == keep or self._refcounts.get(key):
+                continue
+            self.current_bytes -= self._entries.pop(key)['nbytes']
+    
+    def usage(self):
+        """
+        Summarize memory use of the store
+        
+        Returns:
+            dict: 'n_entries', 'bytes', 'pinned_bytes', 'max_bytes' and
+            'references' (number of live session handles)
+        """
+        with self._lock:
+            return {
+                'n_entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'pinned_bytes': sum(
+                    entry['nbytes'] for key, entry in self._entries.items()
+                    if self._refcounts.get(key)
+                ),
+                'max_bytes': self.max_bytes,
+                'references': sum(self._refcounts.values())
+            }
+    
+    def clear(self):
+        """Remove all unpinned datasets"""
+        with self._lock:
+            for key in list(self._entries):
+                if not self._refcounts.get(key):
+                    self.current_bytes -= self._entries.pop(key)['nbytes']
+    
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+# Process-wide cache shared by all reruns
+_dataset_cache = DatasetCache(DATASET_CACHE_MAX_MB * 1024 * 1024)
+
+
+def get_dataset_cache():
+    """Get the process-wide dataset cache"""
+    return _dataset_cache
@@ -0,0 +1,233 @@
+"""
+Chunked CSV ingestion with dtype downcasting for ForestCal application
+"""
+import numpy as np
+import pandas as pd
+from config.settings import CSV_CHUNK_ROWS, CATEGORY_MAX_UNIQUE
+
+# Decimal places checked when testing whether float32 keeps a column lossless
+MAX_FLOAT_DECIMALS = 6
+
+
+def _frame_bytes(df):
+    """Deep memory usage of a DataFrame in bytes"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _downcast_integer(col):
+    """
+    Downcast an integer column to the narrowest signed/unsigned type
+    
+    Args:
+        col: integer pandas Series
+        
+    Returns:
+        pandas Series
+    """
+    if len(col) and col.min() >= 0:
+        return pd.to_numeric(col, downcast='unsigned')
+    return pd.to_numeric(col, downcast='integer')
+
+
+def _downcast_float(col):
+    """
+    Downcast a float column to float32 when no parsed value changes
+    
+    Values come from decimal text, so float32 is accepted when rounding
+    the float32 value back to the column's decimal precision gives the
+    original float64 value for every row.
+    
+    Args:
+        col: float64 pandas Series
+        
+    Returns:
+        pandas Series
+    """
+    values = col.to_numpy()
+    finite = values[np.isfinite(values)]
+    if finite.size and np.abs(finite).max() >= np.finfo(np.float32).max:
+        return col
+    
+    as32 = values.astype(np.float32).astype(np.float64)
+    for decimals in range(MAX_FLOAT_DECIMALS + 1):
+        if np.array_equal(np.round(finite, decimals), finite):
+            if np.array_equal(np.round(as32, decimals), values, equal_nan=True):
+                return col.astype(np.float32)
+            return col
+    return col
+
+
+def _shrink_chunk(chunk, category_values):
+    """
+    Downcast numeric columns and categorize low-cardinality text columns
+    
+    Args:
+        chunk: DataFrame chunk as parsed by pd.read_csv
+        category_values: dict column -> set of values seen so far, or None
+            once the column exceeded CATEGORY_MAX_UNIQUE (updated in place)
+            
+    Returns:
+        pandas DataFrame
+    """
+    for c in chunk.columns:
+        col = chunk[c]
+        if pd.api.types.is_integer_dtype(col.dtype):
+            chunk[c] = _downcast_integer(col)
+        elif pd.api.types.is_float_dtype(col.dtype):
+            chunk[c] = _downcast_float(col)
+        elif pd.api.types.is_string_dtype(col.dtype) or col.dtype == 'object':
+            seen = category_values.setdefault(c, set())
+            if seen is None:
+                continue
+            seen.update(col.dropna().unique().tolist())
+            if len(seen) > CATEGORY_MAX_UNIQUE:
+                category_values[c] = None
+            else:
+                chunk[c] = col.astype('category')
+    return chunk
+
+
+def _combine_chunks(chunks, category_values, text_dtypes):
+    """
+    Align categorical columns across chunks and concatenate them
+    
+    Args:
+        chunks: list of shrunk DataFrame chunks
+        category_values: dict from _shrink_chunk
+        text_dtypes: dict column -> dtype parsed by pd.read_csv
+        
+    Returns:
+        pandas DataFrame
+    """
+    for c, seen in category_values.items():
+        if seen is None:
+            # Column outgrew the limit: undo early chunks' categories
+            for chunk in chunks:
+                if isinstance(chunk[c].dtype, pd.CategoricalDtype):
+                    chunk[c] = chunk[c].astype(text_dtypes[c])
+        else:
+            categories = pd.Index(sorted(seen, key=str))
+            for chunk in chunks:
+                if isinstance(chunk[c].dtype, pd.CategoricalDtype):
+                    chunk[c] = chunk[c].cat.set_categories(categories)
+    
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def combine_frames(frames):
+    """
+    Concatenate separately shrunk frames with aligned categories
+    
+    A column stays 'category' only when it is categorical in every frame
+    and the union of categories stays within CATEGORY_MAX_UNIQUE.
+    
+    Args:
+        frames: list of pandas DataFrame with the same columns
+        
+    Returns:
+        pandas DataFrame
+    """
+    category_values = {}
+    text_dtypes = {}
+    for c in frames[0].columns:
+        dtypes = [frame[c].dtype for frame in frames]
+        if not any(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            continue
+        text_dtypes[c] = next(
+            (dtype for dtype in dtypes if not isinstance(dtype, pd.CategoricalDtype)),
+            frames[0][c].cat.categories.dtype
+        )
+        if all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            seen = set()
+            for dtype in dtypes:
+                seen.update(dtype.categories.tolist())
+            category_values[c] = seen if len(seen) <= CATEGORY_MAX_UNIQUE else None
+        else:
+            category_values[c] = None
+    return _combine_chunks(list(frames), category_values, text_dtypes)
+
+
+def shrink_dtypes(df):
+    """
+    Apply the chunked-ingestion dtype rules to an in-memory frame
+    
+    Args:
+        df: pandas DataFrame with parser default dtypes
+        
+    Returns:
+        pandas DataFrame
+    """
+    category_values = {}
+    text_dtypes = {
+        c: df[c].dtype for c in df.columns
+        if pd.api.types.is_string_dtype(df[c].dtype) or df[c].dtype == 'object'
+    }
+    return _combine_chunks([_shrink_chunk(df, category_values)], category_values, text_dtypes)
+
+
+def iter_csv_chunks(source, usecols=None, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Iterate over a CSV in chunks with parser default dtypes
+    
+    Args:
+        source: path or file-like object accepted by pd.read_csv
+        usecols: optional list of columns to parse
+        chunk_rows: number of rows parsed per chunk
+        
+    Returns:
+        iterator of pandas DataFrame
+    """
+    return pd.read_csv(source, usecols=usecols, chunksize=chunk_rows)
+
+
+def read_csv_chunked(source, chunk_rows=CSV_CHUNK_ROWS, usecols=None):
+    """
+    Read a CSV in chunks, shrinking dtypes as each chunk arrives
+    
+    Integer columns get the narrowest integer type, float columns become
+    float32 when that is lossless, and text columns with at most
+    CATEGORY_MAX_UNIQUE distinct values become 'category'.
+    
+    Args:
+        source: path or file-like object accepted by pd.read_csv
+        chunk_rows: number of rows parsed per chunk
+        usecols: optional list of columns to parse
+        
+    Returns:
+        tuple: (DataFrame, ingest report dict)
+    """
+    chunks = []
+    category_values = {}
+    text_dtypes = {}
+    naive_bytes = 0
+    held_bytes = 0
+    peak_bytes = 0
+    
+    for chunk in iter_csv_chunks(source, usecols, chunk_rows):
+        chunk_bytes = _frame_bytes(chunk)
+        naive_bytes += chunk_bytes
+        peak_bytes = max(peak_bytes, held_bytes + chunk_bytes)
+        
+        for c in chunk.columns:
+            if pd.api.types.is_string_dtype(chunk[c].dtype) or chunk[c].dtype == 'object':
+                text_dtypes.setdefault(c, chunk[c].dtype)
+        chunk = _shrink_chunk(chunk, category_values)
+        held_bytes += _frame_bytes(chunk)
+        chunks.append(chunk)
+    
+    df = _combine_chunks(chunks, category_values, text_dtypes)
+    final_bytes = _frame_bytes(df)
+    if len(chunks) > 1:
+        # pd.concat holds the chunks and the combined frame at once
+        peak_bytes = max(peak_bytes, held_bytes + final_bytes)
+    else:
+        peak_bytes = max(peak_bytes, final_bytes)
+    
+    return df, {
+        'n_chunks': len(chunks),
+        'naive_bytes': naive_bytes,
+        'peak_bytes': peak_bytes,
+        'final_bytes': final_bytes
+    }
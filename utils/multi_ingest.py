@@ -0,0 +1,210 @@
+"""
+Parallel multi-file CSV ingestion for ForestCal application
+"""
+import glob
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from config.settings import (
+    MULTI_INGEST_ROOT,
+    MULTI_INGEST_SUFFIXES,
+    MULTI_INGEST_MAX_WORKERS,
+    MP_START_METHOD,
+)
+from utils.ingestion import read_csv_chunked, combine_frames
+
+# A file taking longer than this multiple of the median is flagged slow
+SLOW_FILE_FACTOR = 2.0
+
+
+def _is_within(path, root):
+    """Whether a resolved path lies inside a resolved root directory"""
+    return os.path.commonpath([path, root]) == root
+
+
+def resolve_ingest_directory(directory, root=MULTI_INGEST_ROOT):
+    """
+    Resolve a folder below the configured ingest root
+    
+    The folder is taken relative to the root; '..' components and
+    symlinks are resolved first, so neither can leave the root.
+    
+    Args:
+        directory: folder path relative to the root
+        root: ingest root directory (None = folder ingestion disabled)
+        
+    Returns:
+        str: resolved absolute folder path
+        
+    Raises:
+        ValueError: when ingestion is disabled or the folder lies outside
+            the root
+    """
+    if root is None:
+        raise ValueError("Pembacaan folder tidak diaktifkan (MULTI_INGEST_ROOT belum diatur)")
+    
+    real_root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(real_root, directory))
+    if not _is_within(path, real_root):
+        raise ValueError(f"Folder di luar direktori yang diizinkan: {directory}")
+    return path
+
+
+def list_dataset_files(directory, pattern, root=MULTI_INGEST_ROOT):
+    """
+    List CSV files (plain, .gz or .zst) in a folder below the ingest root
+    
+    Matches that resolve outside the root (through '..' in the pattern or
+    a symlink) and files with another suffix are skipped.
+    
+    Args:
+        directory: folder path relative to the root
+        pattern: glob pattern, e.g. '*.csv*'
+        root: ingest root directory (None = folder ingestion disabled)
+        
+    Returns:
+        list: sorted resolved file paths
+        
+    Raises:
+        ValueError: when ingestion is disabled or the folder lies outside
+            the root
+    """
+    real_root = os.path.realpath(root) if root is not None else None
+    folder = resolve_ingest_directory(directory, root)
+    paths = set()
+    for match in glob.glob(os.path.join(folder, pattern)):
+        path = os.path.realpath(match)
+        if (
+            os.path.isfile(path)
+            and _is_within(path, real_root)
+            and path.lower().endswith(MULTI_INGEST_SUFFIXES)
+        ):
+            paths.add(path)
+    return sorted(paths)
+
+
+def fingerprint_files(paths):
+    """
+    Identify a set of files by name, size and modification time
+    
+    Args:
+        paths: list of file paths
+        
+    Returns:
+        str: hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _parse_file(path):
+    """
+    Parse one file in a worker process
+    
+    Compression is inferred by pandas from the extension (.gz, .zst).
+    
+    Args:
+        path: file path
+        
+    Returns:
+        tuple: (DataFrame or None, seconds, error message or None)
+    """
+    start = time.perf_counter()
+    try:
+        df, _ = read_csv_chunked(path)
+        return df, time.perf_counter() - start, None
+    except Exception as e:
+        return None, time.perf_counter() - start, str(e)
+
+
+def _schema_of(df):
+    """Column names with a coarse kind (numeric / text) per column"""
+    return [
+        (c, 'numeric' if pd.api.types.is_numeric_dtype(df[c].dtype) else 'text')
+        for c in df.columns
+    ]
+
+
+def _schema_difference(reference, schema):
+    """Describe how a file's schema differs from the reference"""
+    ref_cols = [c for c, _ in reference]
+    cols = [c for c, _ in schema]
+    missing = [c for c in ref_cols if c not in cols]
+    extra = [c for c in cols if c not in ref_cols]
+    if missing or extra:
+        parts = []
+        if missing:
+            parts.append(f"kolom hilang: {', '.join(missing)}")
+        if extra:
+            parts.append(f"kolom tambahan: {', '.join(extra)}")
+        return "; ".join(parts)
+    
+    kinds = dict(schema)
+    mismatched = [c for c, kind in reference if kinds[c] != kind]
+    if mismatched:
+        return f"tipe berbeda: {', '.join(mismatched)}"
+    return None
+
+
+def ingest_csv_files(paths, max_workers=MULTI_INGEST_MAX_WORKERS):
+    """
+    Parse many CSV files in a process pool and concatenate them
+    
+    Each file is parsed with the chunked, dtype-shrinking reader. Files
+    whose columns or column kinds differ from the first readable file
+    are left out; the rest are combined in a single concatenation.
+    
+    Args:
+        paths: list of file paths
+        max_workers: worker processes (None = one per CPU)
+        
+    Returns:
+        tuple: (DataFrame or None, per-file report DataFrame)
+    """
+    context = multiprocessing.get_context(MP_START_METHOD)
+    workers = min(len(paths), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max(workers, 1), mp_context=context) as pool:
+        results = list(pool.map(_parse_file, paths))
+    
+    frames = []
+    rows = []
+    reference = None
+    for path, (df, seconds, error) in zip(paths, results):
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        status = 'ok'
+        if error is not None:
+            status = f"gagal: {error}"
+        else:
+            schema = _schema_of(df)
+            if reference is None:
+                reference = schema
+            difference = _schema_difference(reference, schema)
+            if difference:
+                status = f"schema berbeda ({difference})"
+            else:
+                frames.append(df[[c for c, _ in reference]])
+        rows.append({
+            'file': os.path.basename(path),
+            'rows': len(df) if df is not None else 0,
+            'size_mb': size_mb,
+            'seconds': seconds,
+            'mb_per_s': size_mb / seconds if seconds > 0 else float('nan'),
+            'status': status
+        })
+    
+    report = pd.DataFrame(rows)
+    if len(report):
+        median_seconds = report.loc[report['status'] == 'ok', 'seconds'].median()
+        slow = (report['status'] == 'ok') & (report['seconds'] > SLOW_FILE_FACTOR * median_seconds)
+        report.loc[slow, 'status'] = 'lambat'
+    
+    if not frames:
+        return None, report
+    return combine_frames(frames), report
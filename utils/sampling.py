@@ -0,0 +1,181 @@
+"""
+Streaming sampling for exploring large datasets in ForestCal application
+"""
+import numpy as np
+import pandas as pd
+
+
+def reservoir_sample(chunks, n_rows, random_state=42):
+    """
+    Draw a uniform sample without replacement from a stream of chunks
+    
+    Every row gets a uniform random key and the n_rows smallest keys are
+    kept (bottom-k reservoir), so memory stays bounded by one chunk plus
+    the sample no matter how long the stream is.
+    
+    Args:
+        chunks: iterable of pandas DataFrame chunks
+        n_rows: sample size
+        random_state: seed for the random keys
+        
+    Returns:
+        tuple: (sample DataFrame in stream order, population row count)
+    """
+    rng = np.random.default_rng(random_state)
+    sample = None
+    keys = None
+    population = 0
+    
+    for chunk in chunks:
+        population += len(chunk)
+        chunk_keys = rng.random(len(chunk))
+        if sample is None:
+            sample, keys = chunk, chunk_keys
+        else:
+            sample = pd.concat([sample, chunk], ignore_index=True)
+            keys = np.concatenate([keys, chunk_keys])
+        
+        if len(sample) > n_rows:
+            keep = np.sort(np.argpartition(keys, n_rows)[:n_rows])
+            sample = sample.iloc[keep].reset_index(drop=True)
+            keys = keys[keep]
+    
+    return sample, population
+
+
+def _strata(df, stratify_col):
+    """Stratum labels of a chunk, with missing values as their own stratum"""
+    return df[stratify_col].astype(object).where(df[stratify_col].notna(), '__missing__')
+
+
+def _allocate(stratum_sizes, available, n_rows):
+    """
+    Split a sample size over strata in proportion to their sizes
+    
+    Every stratum first gets one row when n_rows covers all strata (so
+    small strata are never lost); the rest is shared in proportion to
+    the remaining rows and rounded by largest remainders, so the
+    allocation sums exactly to min(n_rows, available rows). A stratum
+    never gets more rows than it has available; its excess goes to the
+    others.
+    
+    Args:
+        stratum_sizes: pandas Series stratum -> rows in the population
+        available: pandas Series stratum -> rows that can be drawn
+        n_rows: total sample size
+        
+    Returns:
+        pandas Series stratum -> rows to draw
+    """
+    available = available.reindex(stratum_sizes.index, fill_value=0).to_numpy(dtype=np.int64)
+    sizes = stratum_sizes.to_numpy(dtype=np.float64)
+    allocation = np.zeros(len(sizes), dtype=np.int64)
+    pending = np.ones(len(sizes), dtype=bool)
+    budget = min(n_rows, int(available.sum()))
+    
+    while budget > 0 and pending.any():
+        open_sizes = sizes[pending]
+        n_strata = len(open_sizes)
+        if budget >= n_strata and open_sizes.sum() > n_strata:
+            quotas = 1 + (budget - n_strata) * (open_sizes - 1) / (open_sizes.sum() - n_strata)
+        elif budget >= n_strata:
+            quotas = np.full(n_strata, budget / n_strata)
+        else:
+            quotas = budget * open_sizes / open_sizes.sum()
+        
+        short = quotas > available[pending]
+        if short.any():
+            # Strata without enough rows give everything they have
+            idx = np.flatnonzero(pending)[short]
+            allocation[idx] = available[idx]
+            budget -= int(available[idx].sum())
+            pending[idx] = False
+            continue
+        
+        counts = np.floor(quotas).astype(np.int64)
+        extra = budget - int(counts.sum())
+        if extra > 0:
+            order = np.argsort(counts - quotas, kind='stable')
+            counts[order[:extra]] += 1
+        allocation[pending] = counts
+        break
+    
+    return pd.Series(allocation, index=stratum_sizes.index)
+
+
+def stratified_sample(chunks, n_rows, stratify_col, random_state=42):
+    """
+    Draw a proportionally stratified sample from a stream of chunks
+    
+    Each stratum keeps a bottom-k reservoir sized by its allocation of
+    n_rows (_allocate) over the strata seen so far, so at most n_rows
+    rows are held besides the current chunk and the sample has exactly
+    min(n_rows, population) rows. Allocations are exact when the strata
+    shares are stable along the stream; a stratum whose share grows late
+    draws its extra rows from the later chunks.
+    
+    Args:
+        chunks: iterable of pandas DataFrame chunks
+        n_rows: total sample size
+        stratify_col: column defining the strata
+        random_state: seed for the random keys
+        
+    Returns:
+        tuple: (sample DataFrame in stream order, population row count)
+        
+    Raises:
+        ValueError: when the data has no column stratify_col
+    """
+    rng = np.random.default_rng(random_state)
+    kept = None
+    stratum_sizes = pd.Series(dtype='int64')
+    
+    for chunk in chunks:
+        if stratify_col not in chunk.columns:
+            raise ValueError(f"Kolom stratifikasi '{stratify_col}' tidak ada di dataset")
+        chunk = chunk.assign(_sample_key=rng.random(len(chunk)))
+        stratum_sizes = stratum_sizes.add(_strata(chunk, stratify_col).value_counts(), fill_value=0)
+        kept = chunk if kept is None else pd.concat([kept, chunk], ignore_index=True)
+        kept = kept.sort_values('_sample_key')
+        strata = _strata(kept, stratify_col)
+        allocation = _allocate(stratum_sizes, strata.value_counts(), n_rows)
+        rank = kept.groupby(strata, sort=False).cumcount()
+        kept = kept[rank < strata.map(allocation)].sort_index()
+    
+    if kept is None:
+        return pd.DataFrame(), 0
+    
+    sample = kept.drop(columns='_sample_key').reset_index(drop=True)
+    return sample, int(stratum_sizes.sum())
+
+
+def sampling_error(sample, population_rows):
+    """
+    Estimate the standard error of each numeric column's mean
+    
+    Uses the simple-random-sampling formula with finite population
+    correction, s / sqrt(n) * sqrt((N - n) / (N - 1)); for stratified
+    samples this is a conservative upper estimate.
+    
+    Args:
+        sample: sampled pandas DataFrame
+        population_rows: number of rows in the full dataset
+        
+    Returns:
+        pandas DataFrame indexed by column with 'mean', 'std_error' and
+        'relative_error_pct'
+    """
+    numeric = sample.select_dtypes(include=[np.number])
+    n = len(sample)
+    if n == 0 or population_rows <= 1:
+        fpc = 0.0
+    else:
+        fpc = np.sqrt(max(population_rows - n, 0) / (population_rows - 1))
+    
+    mean = numeric.mean()
+    std_error = numeric.std() / np.sqrt(max(n, 1)) * fpc
+    return pd.DataFrame({
+        'mean': mean,
+        'std_error': std_error,
+        'relative_error_pct': (std_error / mean.abs().replace(0, np.nan)) * 100
+    })
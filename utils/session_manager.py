@@ -2,6 +2,7 @@
 Session state management for ForestCal application
 """
 import streamlit as st
+from utils.dataset_cache import get_dataset_cache
 
 
 def initialize_session_state():
@@ -9,15 +10,33 @@ def initialize_session_state():
     if 'page' not in st.session_state:
         st.session_state.page = 'Home'
     
-    if 'df' not in st.session_state:
-        st.session_state.df = None
+    if 'dataset' not in st.session_state:
+        st.session_state.dataset = None
     
-    if 'df_processed' not in st.session_state:
-        st.session_state.df_processed = None
+    if 'column_profile' not in st.session_state:
+        st.session_state.column_profile = None
+    
+    if 'model_inputs' not in st.session_state:
+        st.session_state.model_inputs = None
     
     if 'pipeline' not in st.session_state:
         st.session_state.pipeline = None
     
+    if 'training_key' not in st.session_state:
+        st.session_state.training_key = None
+    
+    if 'model_evaluation' not in st.session_state:
+        st.session_state.model_evaluation = 'hold-out'
+    
+    if 'model_engine' not in st.session_state:
+        st.session_state.model_engine = 'random forest'
+    
+    if 'engine_comparison' not in st.session_state:
+        st.session_state.engine_comparison = None
+    
+    if 'model_preview' not in st.session_state:
+        st.session_state.model_preview = None
+    
     if 'target_col' not in st.session_state:
         st.session_state.target_col = None
     
@@ -27,6 +46,9 @@ def initialize_session_state():
     if 'missing_strategy' not in st.session_state:
         st.session_state.missing_strategy = 'drop rows'
     
+    if 'encoding_mode' not in st.session_state:
+        st.session_state.encoding_mode = 'auto'
+    
     if 'scaling_option' not in st.session_state:
         st.session_state.scaling_option = True
     
@@ -34,6 +56,56 @@ def initialize_session_state():
         st.session_state.random_state = 42
 
 
+def set_active_dataset(entry):
+    """
+    Point this session at a dataset in the shared store
+    
+    The session keeps only a DatasetHandle; the DataFrame itself lives
+    once in the process-wide store no matter how many sessions use it.
+    The previous dataset's reference is released.
+    
+    Args:
+        entry: cache entry returned by the data_handler loaders, or None
+    """
+    current = st.session_state.get('dataset')
+    if entry is not None and current is not None and current.key == entry['key']:
+        return
+    
+    if current is not None:
+        current.release()
+    st.session_state.dataset = get_dataset_cache().acquire(entry) if entry is not None else None
+
+
+def get_active_dataframe():
+    """Copy-on-write view of this session's dataset, or None"""
+    handle = st.session_state.get('dataset')
+    return handle.df if handle is not None else None
+
+
+def get_active_dataset_info():
+    """Cache entry (stats, profile, source) of this session's dataset, or None"""
+    handle = st.session_state.get('dataset')
+    return handle.info if handle is not None else None
+
+
+def describe_live_model():
+    """
+    Describe the model the analysis pages currently use
+    
+    Returns:
+        str or None: None without a trained model
+    """
+    if st.session_state.get('pipeline') is None:
+        return None
+    preview = st.session_state.get('model_preview')
+    if preview is not None:
+        return (
+            f"pratinjau ({preview['n_estimators']} pohon, kedalaman {preview['max_depth']}, "
+            f"{preview['n_rows']:,} baris sampel)"
+        )
+    return f"model penuh ({st.session_state.get('model_engine', 'random forest')})"
+
+
 def navigate_to(page_name):
     """Navigate to a specific page"""
     st.session_state.page = page_name
@@ -0,0 +1,291 @@
+"""
+Streaming statistics for out-of-core imputation in ForestCal application
+
+All summaries are updated one chunk at a time and can be merged, so
+fill values for data larger than memory come from a single chunked
+pass. Error bounds, for n non-missing values of a column:
+
+- RunningMoments: count and mean are exact (up to float64 rounding).
+- QuantileSketch: a returned quantile has rank error at most
+  eps * n with eps = (compacted levels) / k, deterministically. Like
+  Series.quantile it interpolates between the two neighbouring ranks,
+  so while nothing was compacted the median is exact.
+  
+Only feed the rows the fill values are meant for (the training rows),
+and only when they cannot be loaded: in-memory data is imputed by
+MissingValueImputer.fit on the training split.
+- HeavyHitters: counts are underestimated by at most n / (k + 1); the
+  mode is exact whenever the column has at most k distinct values.
+"""
+import numpy as np
+import pandas as pd
+from config.settings import STREAM_QUANTILE_K, STREAM_HEAVY_HITTERS
+
+
+class RunningMoments:
+    """
+    Exact running count and mean
+    
+    Chunks are combined with the pairwise update of Chan et al., which
+    stays numerically stable over billions of rows.
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+    
+    def update(self, values):
+        """
+        Add a chunk of values (missing values are ignored)
+        
+        Args:
+            values: numeric pandas Series or numpy array
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size:
+            self._combine(values.size, float(values.mean()))
+    
+    def merge(self, other):
+        """Combine with moments computed on another part of the data"""
+        if other.count:
+            self._combine(other.count, other.mean)
+    
+    def _combine(self, count, mean):
+        total = self.count + count
+        self.mean += (mean - self.mean) * count / total
+        self.count = total
+    
+    def result(self):
+        """Mean of all values seen, NaN when none"""
+        return self.mean if self.count else float('nan')
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch built from a stack of compactors
+    
+    Level h holds up to k values of weight 2**h. A full level is sorted
+    and every other value moves up one level (the kept offset
+    alternates per level). One compaction shifts any rank by at most
+    the level weight, and level h is compacted at most n / (k * 2**h)
+    times, so each level adds rank error at most n / k and the total
+    over all levels is bounded by n * levels / k. Memory is
+    O(k * log2(n / k)) values.
+    
+    Args:
+        k: values kept per level (larger = more accurate)
+    """
+    
+    def __init__(self, k=STREAM_QUANTILE_K):
+        self.k = k
+        self.count = 0
+        self._levels = [np.empty(0)]
+        self._offsets = [0]
+    
+    def update(self, values):
+        """
+        Add a chunk of values (missing values are ignored)
+        
+        Args:
+            values: numeric pandas Series or numpy array
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.count += values.size
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+    
+    def merge(self, other):
+        """Combine with a sketch built on another part of the data"""
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+            self._offsets.append(0)
+        for h, items in enumerate(other._levels):
+            self._levels[h] = np.concatenate([self._levels[h], items])
+        self.count += other.count
+        self._compress()
+    
+    def _compress(self):
+        h = 0
+        while h < len(self._levels):
+            items = self._levels[h]
+            if items.size > self.k:
+                if h + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                    self._offsets.append(0)
+                items = np.sort(items)
+                # An odd leftover value stays at this level
+                if items.size % 2:
+                    items, rest = items[:-1], items[-1:]
+                else:
+                    rest = np.empty(0)
+                promoted = items[self._offsets[h]::2]
+                self._offsets[h] ^= 1
+                self._levels[h] = rest
+                self._levels[h + 1] = np.concatenate([self._levels[h + 1], promoted])
+            h += 1
+    
+    def quantile(self, q):
+        """
+        Approximate q-quantile of all values seen
+        
+        The quantile sits at rank q * (n - 1); between two ranks the
+        values at both are interpolated linearly, as Series.quantile
+        does (so the median of an even count averages the two middle
+        values). Each of the two ranks carries the rank error bound.
+        
+        Args:
+            q: quantile in [0, 1]
+            
+        Returns:
+            float: NaN when no value was seen
+        """
+        if not self.count:
+            return float('nan')
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([
+            np.full(items.size, 2.0 ** h) for h, items in enumerate(self._levels)
+        ])
+        order = np.argsort(values, kind='stable')
+        values = values[order]
+        cumulative = np.cumsum(weights[order])
+        # Item i covers ranks cumulative[i - 1] .. cumulative[i] - 1
+        position = q * (cumulative[-1] - 1)
+        below = np.floor(position)
+        idx = np.searchsorted(cumulative, [below, np.ceil(position)], side='right')
+        low, high = values[np.minimum(idx, values.size - 1)]
+        return float(low + (position - below) * (high - low))
+    
+    def rank_error_bound(self):
+        """
+        Guaranteed relative rank error eps of quantile()
+        
+        Returns:
+            float: number of compacted levels / k (0 while exact)
+        """
+        n_compacting = len(self._levels) - 1
+        return n_compacting / self.k
+
+
+class HeavyHitters:
+    """
+    Misra-Gries frequent-value counters for the categorical mode
+    
+    At most k counters are kept; when a chunk adds more, the (k+1)-th
+    largest count is subtracted from every counter. Each count is
+    then low by at most n / (k + 1), any value more frequent than
+    n / (k + 1) is guaranteed to be kept, and for columns with at most
+    k distinct values the counts (and the mode) are exact.
+    
+    Args:
+        k: number of counters
+    """
+    
+    def __init__(self, k=STREAM_HEAVY_HITTERS):
+        self.k = k
+        self.count = 0
+        self.counters = pd.Series(dtype='int64')
+        self.decremented = 0
+    
+    def update(self, values):
+        """
+        Add a chunk of values (missing values are ignored)
+        
+        Args:
+            values: pandas Series
+        """
+        counts = pd.Series(values).value_counts()
+        counts = counts[counts > 0]
+        self.count += int(counts.sum())
+        self._add(counts)
+    
+    def merge(self, other):
+        """Combine with counters built on another part of the data"""
+        self.count += other.count
+        self.decremented += other.decremented
+        self._add(other.counters)
+    
+    def _add(self, counts):
+        counters = self.counters.add(counts.astype('int64'), fill_value=0).astype('int64')
+        if len(counters) > self.k:
+            cut = int(np.sort(counters.to_numpy())[::-1][self.k])
+            counters = counters - cut
+            counters = counters[counters > 0]
+            self.decremented += cut
+        self.counters = counters
+    
+    def mode(self):
+        """
+        Most frequent value (smallest value among ties, like
+        Series.mode().iloc[0]); 'unknown' when nothing was seen
+        """
+        if self.counters.empty:
+            return 'unknown'
+        top = self.counters[self.counters == self.counters.max()]
+        return sorted(top.index, key=str)[0] if len(top) > 1 else top.index[0]
+    
+    def count_error_bound(self):
+        """
+        Maximum undercount of any counter
+        
+        Returns:
+            int: total amount subtracted, at most n / (k + 1); 0 means
+            the counts are exact
+        """
+        return self.decremented
+
+
+def streaming_fill_values(chunks, feature_cols, strategy):
+    """
+    Fit imputation values for MISSING_STRATEGIES in one chunked pass
+    
+    Counterpart of ml_models.preprocessing.compute_fill_values for data
+    that does not fit in memory: numeric columns feed RunningMoments
+    (mean) or a QuantileSketch (median, also used for 'drop rows' as
+    the scoring fallback), other columns feed HeavyHitters.
+    
+    Args:
+        chunks: iterable of pandas DataFrame chunks with the feature columns
+        feature_cols: list of feature column names
+        strategy: missing value strategy
+        
+    Returns:
+        tuple: (dict column -> fill value, dict column -> error bound)
+            where the bound is the relative rank error for medians, the
+            maximum count error for modes and 0.0 for exact values
+    """
+    summaries = {}
+    is_numeric = {}
+    for chunk in chunks:
+        for c in feature_cols:
+            col = chunk[c]
+            if c not in summaries:
+                is_numeric[c] = isinstance(col.dtype, np.dtype) and np.issubdtype(col.dtype, np.number)
+                if strategy == 'fill with constant (0)':
+                    summaries[c] = None
+                elif not is_numeric[c]:
+                    summaries[c] = HeavyHitters()
+                elif strategy == 'fill numeric mean':
+                    summaries[c] = RunningMoments()
+                else:
+                    summaries[c] = QuantileSketch()
+            if summaries[c] is not None:
+                summaries[c].update(col)
+    
+    fill_values = {}
+    error_bounds = {}
+    for c, summary in summaries.items():
+        if summary is None:
+            fill_values[c] = 0 if is_numeric[c] else '0'
+            error_bounds[c] = 0.0
+        elif isinstance(summary, HeavyHitters):
+            fill_values[c] = summary.mode()
+            error_bounds[c] = float(summary.count_error_bound())
+        elif isinstance(summary, RunningMoments):
+            fill_values[c] = summary.result()
+            error_bounds[c] = 0.0
+        else:
+            fill_values[c] = summary.quantile(0.5)
+            error_bounds[c] = summary.rank_error_bound()
+    return fill_values, error_bounds